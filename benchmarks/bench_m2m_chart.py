@@ -0,0 +1,46 @@
+"""Compare the M2M chart payload and build time against one bar per FX row.
+
+The payload is the figure JSON Streamlit sends to the browser. Run from the
+repository root:
+
+    python -m benchmarks.bench_m2m_chart [--symbols 1000 10000 50000]
+"""
+import argparse
+
+from benchmarks.bench_token_engine import best_of
+from benchmarks.synthetic import make_pos_csv
+from trading_tools.m2m_chart import MAX_BARS, m2m_figure, symbol_m2m
+from trading_tools.pos import read_pos_file
+
+
+def legacy_figure(positions):
+    # The page's previous chart: px.bar over every open FX row
+    import plotly.express as px
+    fx = positions[positions['type'] == 'FX'].sort_values(by=['m2m'])
+    fx = fx[fx['qty'] != 0]
+    fig = px.bar(fx, x='symbol', y='m2m', labels={'symbol': 'Stocks', 'm2m': 'M2M'}, title="M2M")
+    fig.update_layout(xaxis_tickangle=-90)
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    n = MAX_BARS // 2
+    for n_symbols in args.symbols:
+        positions = read_pos_file(make_pos_csv(n_symbols * 5))
+        legacy_time, legacy = best_of(args.repeat, lambda positions=positions: legacy_figure(positions).to_json())
+        bucket_time, bucketed = best_of(
+            args.repeat, lambda positions=positions: m2m_figure(symbol_m2m(positions), top=n, bottom=n).to_json())
+        all_time, every = best_of(
+            args.repeat, lambda positions=positions: m2m_figure(symbol_m2m(positions), top=None).to_json())
+        print(f"{n_symbols:6d} symbols: one bar per row {len(legacy) / 1e3:8.1f} kB {legacy_time * 1000:7.1f} ms | "
+              f"top/bottom {n} {len(bucketed) / 1e3:6.1f} kB {bucket_time * 1000:6.1f} ms | "
+              f"all symbols {len(every) / 1e3:8.1f} kB {all_time * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Run the margin runner against the local stand-in calculator and check it.
+
+Compares one browser context against a pool of them, prints the per-step
+latencies, checks every margin against the stand-in's formula and that an
+unknown stock only fails its own row. Needs Playwright with Chromium
+installed, or an installed Chrome through ``--channel chrome`` or
+``--executable-path``. Run from the repository root:
+
+    python -m benchmarks.bench_margin_runner [--stocks 40] [--concurrency 8] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.margin_standin import expected_margin, standin_server
+from trading_tools.margin_runner import MarginRequest, run_margins, step_summary
+
+EXPIRY = '27-MAR-2025'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stocks', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.2, help="stand-in server delay per calculation")
+    parser.add_argument('--rate', type=float, help="calculator requests (page loads and Adds) per second for the pooled run")
+    parser.add_argument('--channel', help="installed browser to use, e.g. chrome")
+    parser.add_argument('--executable-path', help="browser binary to use")
+    args = parser.parse_args()
+
+    stocks = [f"STK{i:03d}" for i in range(args.stocks)]
+    requests = [MarginRequest(stock, 1000 + 20 * i, EXPIRY) for i, stock in enumerate(stocks)]
+    # One stock the calculator does not list
+    requests.insert(len(requests) // 2, MarginRequest('MISSING', 1000, EXPIRY))
+
+    with standin_server([f"{stock} {EXPIRY}" for stock in stocks], args.latency) as url:
+        for concurrency, rate in ((1, None), (args.concurrency, args.rate)):
+            start = time.perf_counter()
+            results = asyncio.run(run_margins(requests, url, concurrency, rate, channel=args.channel,
+                                              executable_path=args.executable_path))
+            elapsed = time.perf_counter() - start
+            print(f"concurrency {concurrency:2d}: {len(results)} stocks in {elapsed:6.1f} s")
+            print(step_summary(results).round(1).to_string())
+
+            assert [result.stock for result in results] == [request.stock for request in requests]
+            for result in results:
+                if result.stock == 'MISSING':
+                    assert result.margin is None and 'not found' in result.error, result
+                else:
+                    assert result.error is None, result
+                    assert result.margin == expected_margin(result.stock, result.strike), result
+    print("margins match the stand-in in input order; the unknown stock failed on its own row")
+
+
+if __name__ == '__main__':
+    main()
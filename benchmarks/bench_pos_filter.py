@@ -0,0 +1,70 @@
+"""Compare the POS reader's row filter against the old iterrows scan.
+
+The old dashboard loaded the whole sheet and kept the rows where any cell
+was a CE/PE/FX marker with ``iterrows``. ``read_pos_file`` parses the same
+upload, maps the columns and keeps the marker rows as it reads; its time
+below includes parsing the CSV, the scan's does not.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pos_filter [--rows 100000] [--repeat 3]
+"""
+import argparse
+
+import pandas as pd
+
+from benchmarks.bench_token_engine import best_of
+from benchmarks.synthetic import make_pos_csv
+from trading_tools.pos import POS_KEYWORDS, pos_summary, read_pos_file
+
+
+def legacy_position_rows(df):
+    # Row scan of the original parse_pos_contents
+    new_data = []
+    for index, row in df.iterrows():
+        if any(keyword in row.values for keyword in ['CE', 'PE', 'FX']):
+            new_data.append(row)
+    return pd.DataFrame(new_data)
+
+
+def read_positions(upload):
+    upload.seek(0)
+    return read_pos_file(upload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    upload = make_pos_csv(args.rows)
+    sheet = pd.read_csv(upload)
+    print(f"POS sheet: {len(sheet)} rows, markers {POS_KEYWORDS}")
+
+    legacy_time, legacy = best_of(1, legacy_position_rows, sheet)
+    fast_time, positions = best_of(args.repeat, read_positions, upload)
+    print(f"iterrows scan:         {legacy_time * 1000:9.1f} ms")
+    print(f"read_pos_file (csv):   {fast_time * 1000:9.1f} ms  ({legacy_time / fast_time:.0f}x)")
+
+    # Same legs and the same summary on top of them
+    assert len(positions) == len(legacy), (len(positions), len(legacy))
+    legacy_summary = pos_summary_from_rows(legacy)
+    assert pos_summary(positions)[1:] == legacy_summary, legacy_summary
+    print("same rows and summary")
+
+
+def pos_summary_from_rows(rows):
+    # pos_summary's sums applied to the rows picked by the old scan
+    new_data = rows.dropna(axis=1).reset_index(drop=True)
+    fx = new_data[new_data['Unnamed: 7'] == 'FX']
+    exposure = f"{round(fx['Unnamed: 15'].sum() / 100000)} Lac"
+    fx_sum = fx['Unnamed: 9'].astype(float).sum()
+    ce_sum = new_data[new_data['Unnamed: 7'] == 'CE']['Unnamed: 9'].astype(float).sum()
+    pe_sum = new_data[new_data['Unnamed: 7'] == 'PE']['Unnamed: 9'].astype(float).sum()
+    position = 'Matched' if abs(fx_sum) == abs(ce_sum) == abs(pe_sum) else 'Not Matched'
+    return exposure, fx_sum, ce_sum, pe_sum, position
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Compare read_pos_file against a full pd.read_excel of a POS export.
+
+Writes a synthetic POS sheet as .xlsx and .csv to a temporary directory and
+reads it back with each reader, reporting wall time and, with ``--memory``,
+peak Python memory from a second traced pass (tracing slows the reads down
+several times). Run from the repository root:
+
+    python -m benchmarks.bench_pos_reader [--rows 100000] [--memory]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import make_pos_sheet
+from trading_tools.pos import SAMPLE_ROWS, _has_calamine, detect_schema, pos_summary, read_pos_file, to_positions
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def read_excel_positions(path):
+    # The whole sheet through pd.read_excel, then the same column mapping
+    raw = pd.read_excel(path, header=None, dtype=object)
+    schema = detect_schema(raw.iloc[0].tolist(), raw.iloc[1:SAMPLE_ROWS + 1])
+    return to_positions(raw.iloc[1:], schema)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--memory', action='store_true')
+    args = parser.parse_args()
+
+    sheet = make_pos_sheet(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx = os.path.join(tmp, 'pos.xlsx')
+        csv = os.path.join(tmp, 'pos.csv')
+        sheet.to_excel(xlsx, index=False)
+        sheet.to_csv(csv, index=False)
+        print(f"POS sheet: {len(sheet)} rows, {os.path.getsize(xlsx) / 1e6:.1f} MB xlsx")
+
+        runs = [('read_excel (default)', lambda: read_excel_positions(xlsx))]
+        runs.append(('read_pos_file openpyxl', lambda: read_pos_file(xlsx, engine='openpyxl')))
+        if _has_calamine():
+            runs.append(('read_pos_file calamine', lambda: read_pos_file(xlsx, engine='calamine')))
+        runs.append(('read_pos_file csv', lambda: read_pos_file(csv)))
+
+        expected = None
+        for label, run in runs:
+            start = time.perf_counter()
+            rows = run()
+            line = f"{label:24s} {(time.perf_counter() - start) * 1000:9.1f} ms"
+            if args.memory:
+                line += f"  peak {peak_memory(run) / 1e6:7.1f} MB"
+            print(line)
+            summary = pos_summary(rows)
+            if expected is None:
+                expected = summary
+            # Same rows and numbers whichever engine read them
+            pd.testing.assert_frame_equal(summary[0], expected[0], check_dtype=False)
+            assert summary[1:] == expected[1:], (label, summary[1:], expected[1:])
+    print("all readers agree")
+
+
+if __name__ == '__main__':
+    main()
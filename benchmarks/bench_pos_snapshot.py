@@ -0,0 +1,62 @@
+"""Time the position-changes diff of a POS re-upload against building its snapshot.
+
+Builds a synthetic book, then a re-upload where a share of the legs changed
+quantity, a few symbols closed and a few opened. A re-upload costs building
+its snapshot once (or nothing when the upload cache has it) plus the diff
+for the changes table. Run from the repository root:
+
+    python -m benchmarks.bench_pos_snapshot [--rows 100000] [--changed 0.01]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_token_engine import best_of
+from benchmarks.synthetic import make_pos_csv
+from trading_tools.pos import read_pos_file
+from trading_tools.pos_snapshot import PosSnapshot
+
+
+def reupload(positions, changed, seed=1):
+    # Every M2M moves, `changed` of the legs trade, ten symbols close and ten open
+    rng = np.random.default_rng(seed)
+    new = positions.copy()
+    new['m2m'] = new['m2m'] + rng.normal(0, 500, len(new)).round(2)
+    legs = rng.random(len(new)) < changed
+    new.loc[legs, 'qty'] = new.loc[legs, 'qty'] + 250
+
+    closed = new['symbol'].cat.categories[:10]
+    opened = positions[positions['symbol'].isin(closed)].copy()
+    opened['symbol'] = opened['symbol'].astype(str).str.replace('STK', 'NEW')
+    new = pd.concat([new[~new['symbol'].isin(closed)].astype({'symbol': str}), opened.astype({'symbol': str})])
+    return new.astype({'symbol': 'category'}).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--changed', type=float, default=0.01)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    positions = read_pos_file(make_pos_csv(args.rows))
+    new = reupload(positions, args.changed)
+    snapshot = PosSnapshot(positions)
+
+    build_time, fresh = best_of(args.repeat, PosSnapshot, new)
+    update_time, (updated, changes) = best_of(args.repeat, snapshot.update, fresh)
+    print(f"{len(new)} legs, {len(changes)} changed rows")
+    print(f"snapshot of the upload: {build_time * 1000:8.1f} ms (totals and reconciliation)")
+    print(f"update from a snapshot: {update_time * 1000:8.1f} ms (the row diff only)")
+
+    # The changes account for every quantity that moved
+    assert updated is fresh
+    moved = changes.groupby('type', observed=False)['qty_change'].sum()
+    expected = new.groupby('type', observed=False)['qty'].sum() - positions.groupby('type', observed=False)['qty'].sum()
+    pd.testing.assert_series_equal(moved, expected, check_names=False)
+    print(f"changes net to the quantity moves; {len(fresh.mismatched())} mismatched symbols")
+
+
+if __name__ == '__main__':
+    main()
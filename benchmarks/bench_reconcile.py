@@ -0,0 +1,49 @@
+"""Time per-symbol reconciliation against the old per-stock loop.
+
+The loop is the practis.py approach generalised to every stock: a filter and
+a groupby per symbol, so it grows with symbols x rows. It only runs on the
+smallest size. Run from the repository root:
+
+    python -m benchmarks.bench_reconcile [--symbols 1000 10000 100000]
+"""
+import argparse
+
+import pandas as pd
+
+from benchmarks.bench_token_engine import best_of
+from benchmarks.synthetic import make_pos_csv
+from trading_tools.pos import read_pos_file
+from trading_tools.reconcile import reconcile
+
+
+def legacy_matched(positions):
+    # One filter plus groupby per stock, as in practis.py
+    matched = {}
+    for stock in positions['symbol'].unique():
+        df = positions[positions['symbol'] == stock]
+        net = df.groupby(by='type', observed=False)['qty'].sum()
+        matched[stock] = abs(net['FX']) == abs(net['CE']) == abs(net['PE'])
+    return pd.Series(matched, dtype=bool)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for i, n_symbols in enumerate(sorted(args.symbols)):
+        positions = read_pos_file(make_pos_csv(n_symbols * 5))
+        elapsed, result = best_of(args.repeat, reconcile, positions)
+        line = f"{n_symbols:7d} symbols {len(positions):7d} legs: reconcile {elapsed * 1000:8.1f} ms"
+
+        if i == 0:
+            legacy_time, legacy = best_of(1, legacy_matched, positions)
+            line += f", per-stock loop {legacy_time * 1000:8.1f} ms"
+            assert legacy.sort_index().equals(result['matched'].sort_index())
+        print(line)
+    print("per-symbol matches agree with the per-stock loop")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Time the offline SPAN engine over a whole sheet and exercise its validation.
+
+Writes synthetic SPAN and exposure files, prices every row of the sheet in
+one call and, on the smallest size, one call per row as the scrapers did.
+The validation harness is then run against "scraped" margins made from the
+engine's totals with a little noise and a few rows off. Run from the
+repository root:
+
+    python -m benchmarks.bench_span_margin [--symbols 200 2000]
+"""
+import argparse
+import datetime
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_token_engine import best_of
+from benchmarks.synthetic import SPAN_COVER, SPAN_MOVES, make_span_files
+from trading_tools.span_margin import SpanParameters, margin_sheet, validate
+
+EXPIRY = datetime.date(2025, 3, 27)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[200, 2000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for i, n_symbols in enumerate(sorted(args.symbols)):
+        with tempfile.TemporaryDirectory() as directory:
+            span_path, exposure_path, sheet = make_span_files(directory, n_symbols, EXPIRY)
+            load_time, params = best_of(1, SpanParameters.from_files, span_path, exposure_path)
+        lot_sizes = dict(zip(sheet['stocks'], sheet['lot']))
+        # Every scenario of the risk arrays is read, in order: a future's
+        # losses are the scenario moves scaled by its scan range
+        futures = params.risk[(params.contracts['kind'] == 'FUT').to_numpy()]
+        shape = -SPAN_MOVES * SPAN_COVER
+        assert np.allclose(futures / futures[:, [14]], shape / shape[14], atol=1e-3)
+
+        sheet_time, result = best_of(args.repeat, margin_sheet, sheet, params, EXPIRY, lot_sizes)
+        line = (f"{n_symbols:5d} symbols, {len(params.contracts):7d} contracts: load {load_time * 1000:7.1f} ms, "
+                f"whole sheet {sheet_time * 1000:6.1f} ms")
+        if i == 0:
+            rows_time, rows = best_of(1, lambda sheet=sheet, params=params, lot_sizes=lot_sizes: pd.concat(
+                [margin_sheet(sheet.iloc[[row]], params, EXPIRY, lot_sizes) for row in range(len(sheet))]))
+            assert np.allclose(rows['Total'].to_numpy(), result['Total'].to_numpy())
+            line += f", row by row {rows_time * 1000:7.1f} ms"
+        print(line)
+
+    # Scraped margins within 1% of the engine except every 25th row, 10% off
+    rng = np.random.default_rng(0)
+    scraped = result['Total'] * (1 + rng.uniform(-0.01, 0.01, len(result)))
+    scraped[::25] *= 1.10
+    result['Margin'] = scraped.map('₹{:,.2f}'.format)
+    _, summary = validate(result, tolerance=0.02)
+    print(summary)
+    assert summary['compared'] == len(result)
+    assert summary['within'] == len(result) - len(result[::25])
+    print("validation flags exactly the rows moved outside the tolerance")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Time a full OI threshold x ATM % sweep and spot-check it against generate_tokens.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sweep [--rows 100000] [--oi 50] [--atm 20]
+"""
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.synthetic import make_bhav_copy
+from trading_tools.bhav_store import frame_digest
+from trading_tools.sweep import TokenSweep
+from trading_tools.token_engine import generate_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--oi', type=int, default=50, help='number of OI thresholds (1..N)')
+    parser.add_argument('--atm', type=int, default=20, help='number of ATM percentages (1..N)')
+    parser.add_argument('--month', default='FEB')
+    parser.add_argument('--checks', type=int, default=25)
+    args = parser.parse_args()
+
+    data = make_bhav_copy(args.rows)
+    # Frames from the bhav store come with their digest; the index is built inside the timer
+    frame_digest(data)
+    thresholds = np.arange(1, args.oi + 1)
+    percentages = np.arange(1, args.atm + 1)
+
+    start = time.perf_counter()
+    sweep = TokenSweep(data, args.month)
+    grid = sweep.run(thresholds, percentages, baseline=(4, 8))
+    elapsed = time.perf_counter() - start
+    print(f"{len(percentages)}x{len(thresholds)} grid in {elapsed * 1000:.1f} ms (index build included)")
+
+    # Spot-check random grid points against the single-point engine
+    rng = np.random.default_rng(0)
+    baseline_tokens = Counter(generate_tokens(data, args.month, 4, 8)[0]['All Columns'])
+    for _, point in grid.sample(args.checks, random_state=rng.integers(1 << 31)).iterrows():
+        result, _ = generate_tokens(data, args.month, point.oi_threshold, point.atm_percentage)
+        tokens = result['All Columns'].tolist()
+        assert len(tokens) == point.total, (point.to_dict(), len(tokens))
+        assert tokens == sweep.tokens(point.oi_threshold, point.atm_percentage)['All Columns'].tolist()
+        added, removed = sweep.diff((point.oi_threshold, point.atm_percentage), (4, 8))
+        # Token lists keep duplicates (a strike at the underlying yields both legs twice)
+        assert Counter(added) == Counter(tokens) - baseline_tokens and len(added) == point.added
+        assert Counter(removed) == baseline_tokens - Counter(tokens) and len(removed) == point.removed
+    print(f"{args.checks} grid points match generate_tokens")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Import-time report for the Streamlit dashboards (``python -X importtime`` style).
+
+For each dashboard the module-level imports are replayed in a fresh
+interpreter under ``-X importtime``; that is the cost paid on every cold
+start. Imports made inside functions (loaded lazily, per page) are then
+measured on top of that baseline so their deferred cost stays visible.
+
+Run from the repository root:
+
+    python -m benchmarks.importtime_report [app.py multi_app.py ...] [--budget-ms 1500]
+"""
+import argparse
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_DASHBOARDS = ['app.py', 'multi_app.py', 'nse_token_app.py', 'streamlit_test.py',
+                      'poition_check.py', 'pages/token_generator.py',
+                      'pages/pos_dashboard.py']
+
+
+def collect_imports(path):
+    """Split the import statements of a script into module-level and lazy ones."""
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'))
+    eager = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    lazy = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for inner in ast.walk(node):
+                if isinstance(inner, (ast.Import, ast.ImportFrom)):
+                    lazy.append(ast.unparse(inner))
+    return eager, list(dict.fromkeys(lazy))
+
+
+def import_times(statements, preload=()):
+    """Run ``statements`` under -X importtime; return [(package, cumulative_us)] for top-level imports."""
+    code = '\n'.join(list(preload) + ['import sys; sys.stderr.write("--- measure ---\\n")'] + list(statements))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=Path.cwd())
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    measured = proc.stderr.split('--- measure ---\n', 1)[-1]
+    results = []
+    for line in measured.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented; only the top-level ones add up to the total
+        if not name[1:].startswith(' '):
+            results.append((name.strip(), int(cumulative)))
+    return results
+
+
+def report(path, top):
+    eager, lazy = collect_imports(path)
+    startup = import_times(eager)
+    total = sum(us for _, us in startup)
+    print(f"{path}: cold start imports {total / 1000:.1f} ms")
+    for name, us in sorted(startup, key=lambda item: -item[1])[:top]:
+        print(f"    {us / 1000:9.1f} ms  {name}")
+    if lazy:
+        deferred = import_times(lazy, preload=eager)
+        print(f"  deferred (per page) imports {sum(us for _, us in deferred) / 1000:.1f} ms")
+        for name, us in sorted(deferred, key=lambda item: -item[1])[:top]:
+            print(f"    {us / 1000:9.1f} ms  {name}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('dashboards', nargs='*', default=DEFAULT_DASHBOARDS)
+    parser.add_argument('--top', type=int, default=8, help='entries listed per dashboard')
+    parser.add_argument('--budget-ms', type=float, help='fail when a cold start exceeds this')
+    args = parser.parse_args()
+
+    over_budget = []
+    for path in args.dashboards:
+        total = report(path, args.top)
+        if args.budget_ms is not None and total / 1000 > args.budget_ms:
+            over_budget.append(path)
+    if over_budget:
+        raise SystemExit(f"Over the {args.budget_ms:g} ms budget: {', '.join(over_budget)}")
+
+
+if __name__ == '__main__':
+    main()
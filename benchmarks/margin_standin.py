@@ -0,0 +1,141 @@
+"""Local stand-in for the Zerodha SPAN margin calculator page.
+
+Serves a form with the selectors ``trading_tools.margin_runner`` drives: a
+select2-style scrip list whose results appear shortly after the search is
+typed, buy/sell radios, product, option type and strike inputs, Add/Reset
+buttons and the ``span.val.total`` result. Every Add posts
+the legs entered so far to ``/api/margin``; the server answers after
+``latency`` seconds with a deterministic total, which ``expected_margin``
+reproduces for checking results.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOT_SIZE = 100
+
+PAGE = """<!doctype html>
+<html><head><title>SPAN Calculator</title>
+<style>ul.select2-results__options { display: none; } ul.open { display: block; }</style>
+</head><body>
+<form id="calc">
+  <span id="select2-scrip-container">Select scrip</span>
+  <div class="select2-dropdown">
+    <input class="select2-search__field" type="search">
+    <ul class="select2-results__options"></ul>
+  </div>
+  <select id="product"><option value="FUT">Futures</option><option value="OPT">Options</option></select>
+  <select id="option_type"><option value="CE">Calls</option><option value="PE">Puts</option></select>
+  <input id="strike_price" type="text">
+  <label><input type="radio" name="trade" value="buy"> Buy</label>
+  <label><input type="radio" name="trade" value="sell"> Sell</label>
+  <input type="submit" value="Add">
+  <input type="button" id="reset" value="Reset">
+</form>
+<div class="margin-calculator-wrap">Total <span class="val total">0</span></div>
+<script>
+let scrip = null, legs = [];
+const list = document.querySelector('ul.select2-results__options');
+const scrips = %(scrips)s;
+document.querySelector('#select2-scrip-container').onclick = () => list.classList.add('open');
+// Like select2 with a remote source, results arrive a little after the search is typed
+document.querySelector('.select2-search__field').oninput = (e) => setTimeout(() => {
+  list.replaceChildren();
+  for (const name of scrips.filter((name) => name.includes(e.target.value))) {
+    const li = document.createElement('li');
+    li.className = 'select2-results__option';
+    li.textContent = name;
+    li.onclick = () => {
+      scrip = name;
+      document.querySelector('#select2-scrip-container').textContent = scrip;
+      list.classList.remove('open');
+    };
+    list.appendChild(li);
+  }
+}, 150);
+document.querySelector('#calc').onsubmit = async (e) => {
+  e.preventDefault();
+  const side = document.querySelector('input[name=trade]:checked');
+  const product = document.querySelector('#product').value;
+  legs.push({scrip: scrip, product: product, side: side ? side.value : 'buy',
+             option_type: product === 'OPT' ? document.querySelector('#option_type').value : null,
+             strike: product === 'OPT' ? parseFloat(document.querySelector('#strike_price').value) : null});
+  const response = await fetch('/api/margin', {method: 'POST', body: JSON.stringify({legs: legs})});
+  const result = await response.json();
+  document.querySelector('span.val.total').textContent =
+    'Rs. ' + result.total.toLocaleString('en-IN', {minimumFractionDigits: 2});
+};
+document.querySelector('#reset').onclick = () => {
+  legs = [];
+  document.querySelector('span.val.total').textContent = '0';
+};
+</script>
+</body></html>
+"""
+
+
+def spot_price(symbol):
+    # Stable made-up underlying price per symbol
+    return 500.0 + sum(map(ord, symbol)) % 97 * 25
+
+
+def leg_margin(leg):
+    symbol = leg['scrip'].split()[0]
+    if leg['product'] == 'FUT':
+        rate = 0.15 if leg['side'] == 'sell' else 0.12
+        return rate * spot_price(symbol) * LOT_SIZE
+    if leg['side'] == 'sell':
+        return 0.12 * leg['strike'] * LOT_SIZE
+    # Long options offset part of the short legs
+    return -0.05 * leg['strike'] * LOT_SIZE
+
+
+def expected_margin(stock, strike):
+    """Total the stand-in shows for a short future, short put and long call."""
+    legs = [
+        {'scrip': stock, 'product': 'FUT', 'side': 'sell'},
+        {'scrip': stock, 'product': 'OPT', 'side': 'sell', 'strike': float(strike)},
+        {'scrip': stock, 'product': 'OPT', 'side': 'buy', 'strike': float(strike)},
+    ]
+    return round(sum(leg_margin(leg) for leg in legs), 2)
+
+
+def make_handler(scrips, latency):
+    page = (PAGE % {'scrips': json.dumps(list(scrips))}).encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._send(page, 'text/html; charset=utf-8')
+
+        def do_POST(self):
+            legs = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['legs']
+            time.sleep(latency)
+            total = round(sum(leg_margin(leg) for leg in legs), 2)
+            self._send(json.dumps({'total': total}).encode('utf-8'), 'application/json')
+
+        def _send(self, body, content_type):
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+@contextmanager
+def standin_server(scrips, latency=0.2):
+    """Serve the stand-in calculator on a free local port; yields its URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(scrips, latency))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/margin-calculator/SPAN/"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,222 @@
+"""Synthetic inputs shaped like the files the dashboards consume."""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+def _last_thursday(year, month):
+    if month == 12:
+        day = datetime.date(year + 1, 1, 1) - datetime.timedelta(days=1)
+    else:
+        day = datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)
+    while day.weekday() != 3:
+        day -= datetime.timedelta(days=1)
+    return day
+
+
+def _strike_text(strikes):
+    # Whole strikes print without decimals, fractional ones keep them (e.g. 7.5)
+    whole = strikes == np.floor(strikes)
+    text = strikes.astype(str)
+    text[whole] = strikes[whole].astype(np.int64).astype(str)
+    return text
+
+
+def make_bhav_copy(n_rows=100_000, trade_date=datetime.date(2025, 1, 15), seed=0, next_year=True):
+    """Return a UDiFF-style F&O bhav copy with roughly ``n_rows`` rows.
+
+    String columns use object dtype, as ``derivatives.fno_bhav_copy`` returns
+    them. The expiries span the next three months and, with ``next_year``,
+    the same months of the following year so month-name matching sees
+    next-year contracts.
+    """
+    rng = np.random.default_rng(seed)
+
+    expiries = []
+    for offset in range(3):
+        month = (trade_date.month - 1 + offset) % 12 + 1
+        year = trade_date.year + (trade_date.month - 1 + offset) // 12
+        expiries.append(_last_thursday(year, month))
+        if next_year:
+            expiries.append(_last_thursday(year + 1, month))
+
+    strikes_per_side = 20
+    per_underlying = len(expiries) * (1 + 2 * 2 * strikes_per_side)
+    n_underlyings = max(1, n_rows // per_underlying)
+
+    symbols = np.array(
+        ['NIFTY', 'BANKNIFTY'] + [f'STK{i:04d}' for i in range(n_underlyings - 2)],
+        dtype=object,
+    )[:n_underlyings]
+    spot = np.round(rng.uniform(5, 5000, n_underlyings), 1)
+    step = np.where(spot < 50, 0.5, np.where(spot < 500, 5.0, 50.0))
+    lot = rng.choice([250, 500, 750, 1000, 1500], n_underlyings)
+
+    frames = []
+    for expiry in expiries:
+        expiry_text = f"{expiry:%y}{MONTHS[expiry.month - 1]}"
+
+        fut = pd.DataFrame({
+            'TckrSymb': symbols,
+            'FinInstrmTp': np.where(np.isin(symbols, ['NIFTY', 'BANKNIFTY']), 'IDF', 'STF'),
+            'XpryDt': expiry.isoformat(),
+            'StrkPric': np.nan,
+            'OptnTp': None,
+            'FinInstrmNm': symbols + expiry_text + 'FUT',
+            'UndrlygPric': spot,
+            'NewBrdLotQty': lot,
+        })
+
+        offsets = np.arange(-strikes_per_side, strikes_per_side)
+        sym_idx = np.repeat(np.arange(n_underlyings), len(offsets))
+        strikes = np.round(spot[sym_idx] / step[sym_idx]) * step[sym_idx] + np.tile(offsets, n_underlyings) * step[sym_idx]
+        strikes = np.maximum(strikes, step[sym_idx])
+        strike_text = _strike_text(strikes).astype(object)
+
+        options = []
+        for option_type in ('CE', 'PE'):
+            options.append(pd.DataFrame({
+                'TckrSymb': symbols[sym_idx],
+                'FinInstrmTp': np.where(np.isin(symbols[sym_idx], ['NIFTY', 'BANKNIFTY']), 'IDO', 'STO'),
+                'XpryDt': expiry.isoformat(),
+                'StrkPric': strikes,
+                'OptnTp': option_type,
+                'FinInstrmNm': symbols[sym_idx] + expiry_text + strike_text + option_type,
+                'UndrlygPric': spot[sym_idx],
+                'NewBrdLotQty': lot[sym_idx],
+            }))
+        frames.extend([fut, *options])
+
+    data = pd.concat(frames, ignore_index=True)
+    data['TradDt'] = trade_date.isoformat()
+    data['OpnIntrst'] = (rng.integers(0, 20, len(data)) * data['NewBrdLotQty']).astype(np.int64)
+    data['ClsPric'] = np.round(rng.uniform(0.05, 500, len(data)), 2)
+    for col in ('TckrSymb', 'FinInstrmTp', 'XpryDt', 'OptnTp', 'FinInstrmNm', 'TradDt'):
+        data[col] = data[col].astype(object)
+    return data
+
+
+def make_pos_sheet(n_rows=100_000, seed=0):
+    """Return a POS export as ``pd.read_excel`` sees it, with roughly ``n_rows`` rows.
+
+    Each stock block is a header row, its FX/CE/PE legs and a subtotal row,
+    all under ``'Unnamed: N'`` columns. The quantity column repeats its
+    caption in every header row, so it comes through as mixed object dtype
+    like the real export.
+    """
+    rng = np.random.default_rng(seed)
+    n_stocks = max(1, n_rows // 5)
+    stocks = np.array([f'STK{i:05d}' for i in range(n_stocks)], dtype=object)
+    qty = rng.integers(1, 50, n_stocks) * 250
+    # A tenth of the stocks carry a mismatched leg
+    skew = np.where(rng.random(n_stocks) < 0.1, 250, 0)
+
+    block = 5
+    n = n_stocks * block
+    columns = {f'Unnamed: {i}': np.full(n, np.nan, dtype=object) for i in range(18)}
+    kind = np.tile(np.arange(block), n_stocks)
+    stock = np.repeat(stocks, block)
+    legs = (kind >= 1) & (kind <= 3)
+
+    columns['Unnamed: 0'][:] = stock
+    columns['Unnamed: 0'][kind == 4] = 'Total'
+    columns['Unnamed: 1'][legs] = 'ACC01'
+    columns['Unnamed: 2'][legs] = 'NFO'
+    columns['Unnamed: 7'][kind == 0] = 'Type'
+    columns['Unnamed: 7'][kind == 1] = 'FX'
+    columns['Unnamed: 7'][kind == 2] = 'CE'
+    columns['Unnamed: 7'][kind == 3] = 'PE'
+    columns['Unnamed: 9'][kind == 0] = 'Net Qty'
+    columns['Unnamed: 9'][kind == 1] = qty
+    columns['Unnamed: 9'][kind == 2] = -(qty + skew)
+    columns['Unnamed: 9'][kind == 3] = qty
+    columns['Unnamed: 9'][kind == 4] = qty - skew
+
+    price = rng.uniform(50, 5000, n_stocks)
+    exposure = np.round(np.repeat(qty * price, block), 2)
+    m2m = np.round(rng.normal(0, 20_000, n), 2)
+    columns['Unnamed: 15'] = np.where(legs, exposure, np.nan)
+    columns['Unnamed: 17'] = np.where(legs | (kind == 4), m2m, np.nan)
+    return pd.DataFrame(columns).infer_objects()
+
+
+def make_pos_csv(n_rows=100_000, seed=0):
+    """``make_pos_sheet`` written out as a CSV upload (a ``BytesIO`` named pos.csv)."""
+    import io
+    buffer = io.BytesIO(make_pos_sheet(n_rows, seed).to_csv(index=False).encode())
+    buffer.name = 'pos.csv'
+    return buffer
+
+
+# SPAN scenario price moves as a fraction of the price scan range, volatility
+# up/down, and the share of the loss counted (the two extreme moves count 35%)
+SPAN_MOVES = np.array([0, 0, 1, 1, -1, -1, 2, 2, -2, -2, 3, 3, -3, -3, 6, -6]) / 3
+SPAN_VOL_SHIFT = np.array([1, -1] * 7 + [0, 0])
+SPAN_COVER = np.array([1.0] * 14 + [0.35, 0.35])
+
+
+def _option_value(spot, strike, vol, call):
+    # Intrinsic value plus a smooth time value peaking at the money
+    intrinsic = np.maximum(spot - strike, 0) if call else np.maximum(strike - spot, 0)
+    moneyness = np.log(spot / strike) / (vol * np.sqrt(30 / 365))
+    return intrinsic + 0.4 * spot * vol * np.sqrt(30 / 365) * np.exp(-moneyness ** 2 / 2)
+
+
+def _ra_xml(losses, delta):
+    # One risk array per contract: the 16 losses as <a> in scenario order, then the delta
+    return "<ra><r>1</r>" + "".join(f"<a>{loss:.4f}</a>" for loss in losses) + f"<d>{delta:.4f}</d></ra>"
+
+
+def make_span_files(directory, n_symbols=200, expiry=datetime.date(2025, 3, 27), seed=0, strikes_per_side=10):
+    """Write a SPAN XML and an ael exposure CSV shaped like NSE's into ``directory``.
+
+    Returns ``(span_path, exposure_path, sheet)``, where ``sheet`` is an
+    atm.xlsx-style frame (stocks, atm, lot) for the generated underlyings.
+    """
+    from pathlib import Path
+    directory = Path(directory)
+    rng = np.random.default_rng(seed)
+    symbols = [f'STK{i:04d}' for i in range(n_symbols)]
+    spot = np.round(rng.uniform(50, 5000, n_symbols), 1)
+    step = np.where(spot < 500, 5.0, 50.0)
+    vol = rng.uniform(0.2, 0.6, n_symbols)
+    lot = rng.choice([250, 500, 750, 1000, 1500], n_symbols)
+    som = np.round(spot * 0.005, 2)
+    expiry_text = f"{expiry:%Y%m%d}"
+
+    parts = ['<?xml version="1.0"?><spanFile><pointInTime><clearingOrg><ec>NSCCL</ec>']
+    atm = np.round(spot / step) * step
+    for i, symbol in enumerate(symbols):
+        scan = spot[i] * vol[i] * 0.35
+        moved = spot[i] + SPAN_MOVES * scan
+        shifted_vol = vol[i] * (1 + 0.25 * SPAN_VOL_SHIFT)
+        fut_losses = -(moved - spot[i]) * SPAN_COVER
+        parts.append(f"<phyPf><pfCode>{symbol}</pfCode><phy><p>{spot[i]}</p></phy></phyPf>")
+        parts.append(f"<futPf><pfCode>{symbol}</pfCode><fut><pe>{expiry_text}</pe><p>{spot[i]}</p>"
+                     f"{_ra_xml(fut_losses, 1.0)}</fut></futPf>")
+        parts.append(f"<oopPf><pfCode>{symbol}</pfCode><series><pe>{expiry_text}</pe>")
+        strikes = atm[i] + np.arange(-strikes_per_side, strikes_per_side + 1) * step[i]
+        for strike in strikes[strikes > 0]:
+            for code, call in (('C', True), ('P', False)):
+                price = _option_value(spot[i], strike, vol[i], call)
+                losses = (price - _option_value(moved, strike, shifted_vol, call)) * SPAN_COVER
+                delta = 0.5 if call else -0.5
+                parts.append(f"<opt><o>{code}</o><k>{strike:g}</k><p>{price:.2f}</p>"
+                             f"{_ra_xml(losses, delta)}</opt>")
+        parts.append("</series></oopPf>")
+        parts.append(f"<ccDef><cc>{symbol}</cc><pfLink><pfCode>{symbol}</pfCode></pfLink>"
+                     f"<somTiers><tier><rate><r>1</r><val>{som[i]}</val></rate></tier></somTiers></ccDef>")
+    parts.append("</clearingOrg></pointInTime></spanFile>")
+
+    span_path = directory / f"nsccl.{expiry_text}.s.spn"
+    span_path.write_text("".join(parts))
+    exposure_path = directory / f"ael_{expiry:%d%m%Y}.csv"
+    pd.DataFrame({
+        'Sr No': np.arange(1, n_symbols + 1), 'Symbol': symbols, 'Instrument Type': 'OTHSTK',
+        'Normal ELM Margin %': 3.5, 'Additional ELM %': 0.0, 'Total applicable ELM %': 3.5,
+    }).to_csv(exposure_path, index=False)
+    sheet = pd.DataFrame({'stocks': symbols, 'atm': atm, 'lot': lot})
+    return span_path, exposure_path, sheet
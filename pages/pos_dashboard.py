@@ -0,0 +1,130 @@
+import streamlit as st
+from trading_tools.m2m_chart import MAX_BARS, m2m_figure, symbol_m2m
+from trading_tools.pos_accounts import account_breakdown, account_id, account_mismatches, combine_accounts
+from trading_tools.pos_cache import pos_cache, upload_key
+from trading_tools.pos_snapshot import PosSnapshot
+
+# Initialize session state variables if they don't exist
+if 'm2m' not in st.session_state:
+    st.session_state.m2m = None
+
+st.title("POSITION MATCHING")
+st.header("Upload POS Files (Excel or CSV)")
+
+# File uploader; one file per account, tagged with the file name
+uploaded_files = st.file_uploader("Drag and Drop or Select POS Files", type=["xls", "xlsx", "csv"],
+                                  accept_multiple_files=True)
+
+# Process uploaded files
+if uploaded_files:
+    uploads = [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files]
+    upload_id = tuple(sorted((name, *upload_key(data, name)) for name, data in uploads))
+    pos_data = None
+
+    # The cache does not keep files that failed to parse, so reruns on the same upload reuse the error instead
+    failure = st.session_state.get('pos_failure')
+    if st.session_state.get('pos_upload_id') == upload_id:
+        # Rerun on the same upload: reuse its snapshot and changes
+        pos_data = st.session_state.pos_snapshot.positions
+    elif failure is not None and failure[0] == upload_id:
+        _, is_warning, message = failure
+        (st.warning if is_warning else st.error)(message)
+    else:
+        try:
+            # Files not parsed before are read together, on threads when they are large
+            parsed = pos_cache.snapshots(uploads)
+            if len(parsed) == 1:
+                parsed = parsed[0]
+            else:
+                parsed = PosSnapshot(combine_accounts(
+                    [(account_id(name), snapshot.positions) for (name, _), snapshot in zip(uploads, parsed)]))
+            pos_data = parsed.positions
+            st.success(f"Successfully read {len(uploads)} POS file(s)")
+        except ValueError as e:
+            st.warning(str(e))
+            st.session_state.pos_failure = (upload_id, True, str(e))
+        except Exception as e:
+            st.error(f"Error parsing POS file: {str(e)}")
+            st.session_state.pos_failure = (upload_id, False, f"Error parsing POS file: {str(e)}")
+
+        if pos_data is not None:
+            # The new snapshot's totals are used as is; the previous upload only feeds the changes table
+            previous = st.session_state.get('pos_snapshot')
+            if previous is None:
+                snapshot, changes = parsed, None
+            else:
+                snapshot, changes = previous.update(parsed)
+            st.session_state.pos_snapshot = snapshot
+            st.session_state.pos_changes = changes
+            st.session_state.pos_upload_id = upload_id
+
+    if pos_data is not None:
+        # Store data in session state
+        st.session_state.m2m = pos_data
+        snapshot = st.session_state.pos_snapshot
+        exposure, fx_sum, ce_sum, pe_sum, position = snapshot.summary()
+
+        if position == "Matched":
+            position_text = '<span style="color:green; font-weight:bold;">Matched</span>'
+        else:
+            position_text = '<span style="color:red; font-weight:bold;">Not Matched</span>'
+
+        # Display info in expander
+        with st.expander("View Summary Information", expanded=True):
+            st.write(f"Total Exposure: {exposure}")
+            st.write(f"Sum for FX: {fx_sum}")
+            st.write(f"Sum for CE: {ce_sum}")
+            st.write(f"Sum for PE: {pe_sum}")
+            st.markdown(f"**Position:** {position_text}",unsafe_allow_html=True)
+
+        # Position changes since the previous upload of this session
+        changes = st.session_state.pos_changes
+        if changes is not None:
+            with st.expander(f"Changes Since Last Upload ({len(changes)})", expanded=True):
+                if changes.empty:
+                    st.write("No position changes since the last upload.")
+                else:
+                    st.write(", ".join(f"{status}: {count}" for status, count in changes['status'].value_counts().items()))
+                    st.dataframe(changes, hide_index=True)
+
+        # Symbols whose FX, CE and PE legs do not net to the same size
+        mismatched = snapshot.mismatched()
+        if mismatched.empty:
+            st.success("All symbols matched")
+        else:
+            st.subheader(f"Mismatched Symbols ({len(mismatched)})")
+            st.dataframe(mismatched)
+
+        # Per-account totals and mismatches when several accounts were uploaded
+        if len(uploads) > 1:
+            st.subheader("Accounts")
+            st.dataframe(account_breakdown(pos_data))
+            with st.expander("Mismatched Symbols by Account"):
+                st.dataframe(account_mismatches(pos_data))
+
+        # Create and display the bar chart
+        try:
+            m2m = symbol_m2m(pos_data)
+            if not m2m.empty:
+                # Large books show the top and bottom symbols plus an "Others" bar unless asked for all
+                show_all = len(m2m) <= MAX_BARS or st.toggle(f"Show all {len(m2m)} symbols", value=False)
+                n = None
+                if not show_all:
+                    most = max(5, MAX_BARS // 2)
+                    n = st.slider("Top and bottom symbols", min_value=5, max_value=most, value=min(25, most))
+                st.plotly_chart(m2m_figure(m2m, top=n, bottom=n), use_container_width=True)
+            else:
+                st.warning("No data available for plotting after filtering.")
+        except Exception as plot_error:
+            st.error(f"Error creating plot: {str(plot_error)}")
+
+        # Display raw data table
+        with st.expander("View Raw Data", expanded=False):
+            st.dataframe(pos_data)
+else:
+    st.info("Please upload the POS Excel or CSV files.")
+
+# Show upload cache counters
+cache_stats = pos_cache.stats()
+st.sidebar.caption(f"Upload cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                   f"{cache_stats['nbytes'] / 1e6:.1f} MB")
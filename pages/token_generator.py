@@ -0,0 +1,213 @@
+import streamlit as st
+import pandas as pd
+import datetime
+from trading_tools.analysis import is_trading_day, run_analysis
+from trading_tools.expiry import expiry_label
+from trading_tools.bhav_store import default_store
+from trading_tools.result_cache import token_cache
+from trading_tools.sweep import TokenSweep, sweep_tokens
+from trading_tools.token_engine import parse_symbols, token_counts
+from trading_tools.token_export import export_cache, export_mime, export_name
+from trading_tools.trading_calendar import nse_calendar as calendar
+
+# Module-level instances, shared by every page and session of the server
+store = default_store()
+
+st.title("STOCK CR TOKEN")
+st.write("This app generates stock cr token.")
+
+# Create sidebar for inputs
+derivatives_sidebar = st.sidebar.expander("Token Parameters", expanded=True)
+
+with derivatives_sidebar:
+    # Date picker (default to today)
+    today = datetime.date.today()
+    date = st.date_input("Select Date", today)
+    
+    # Expiry selector, resolved to an exact date from the expiries listed in the bhav copy
+    selected_expiry = st.selectbox("Select Expiry", ["NEAR", "NEXT", "FAR"], format_func=str.title)
+    
+    # OI threshold
+    oi_threshold = st.number_input("OI Threshold", min_value=1, value=4)
+    
+    # ATM percentage
+    atm_percentage = st.slider(
+        "ATM Range Percentage", 
+        min_value=1, 
+        max_value=20, 
+        value=8,
+        help="Strike prices beyond this percentage from the underlying price will be induclded base on io threshold"
+    )
+    
+    # Extra underlyings to leave out, on top of the index products and dotted symbols
+    exclude = parse_symbols(st.text_input("Exclude Symbols", help="Comma separated underlyings, e.g. IDEA, YESBANK"))
+
+    # Sort order options
+    sort_ascending = st.checkbox("Sort Ascending", value=True, help="Check for ascending order, uncheck for descending")
+
+# Run analysis button
+if st.button("Generate Token"):
+    # Check if it's a trading day
+    if not is_trading_day(date, calendar):
+        st.warning(f"Selected date ({date}) may not be a trading day. Results may be unavailable.")
+    
+    # Remember the parameters so later reruns (e.g. toggling the sort order) re-render from the result cache
+    st.session_state.token_params = (date, selected_expiry, oi_threshold, atm_percentage, exclude)
+    # A new Generate retries dates that failed before (holidays, unpublished copies, network errors)
+    st.session_state.pop('token_failure', None)
+
+if 'token_params' in st.session_state:
+    # Parameters of the last Generate, kept apart from the live sidebar widgets the sweep reads
+    run_params = st.session_state.token_params
+    run_date, run_expiry, run_oi, run_atm, run_exclude = run_params
+    
+    # Convert date to string
+    date_str = run_date.strftime('%Y-%m-%d')
+    
+    # The store does not keep failed or empty downloads, so other widgets' reruns reuse the error instead
+    failure = st.session_state.get('token_failure')
+    if failure is not None and failure[0] == run_params:
+        result_df, error = None, failure[1]
+    else:
+        # Display a spinner while processing
+        with st.spinner("Processing data..."):
+            result_df, error = run_analysis(date_str, run_expiry, run_oi, run_atm, store, token_cache, run_exclude)
+        if error:
+            st.session_state.token_failure = (run_params, error)
+    
+    if error:
+        st.error(error)
+    else:
+        # Results come back sorted ascending, so descending order is just the reversed frame
+        tokens_df = result_df
+        if not sort_ascending:
+            result_df = result_df.iloc[::-1]
+        
+        # Exact expiry date the selection resolved to
+        expiry_text = expiry_label(result_df.attrs.get('expiry'))
+        
+        st.success("Token Generated successfully!")
+        
+        # Per-type counts come with the result, no scan of the token text
+        counts = token_counts(result_df)
+        futures_count, ce_count, pe_count = counts['FUT'], counts['CE'], counts['PE']
+        
+        # Display the results
+        st.subheader("Show Token")
+        st.dataframe(result_df)
+        
+        # Create download section
+        st.subheader("Download Options")
+        compress = st.checkbox("Compress downloads (gzip)", value=False)
+
+        col1, col2 = st.columns(2)
+
+        # Files are built only when a button is clicked, then cached per result and sort order
+        for column, fmt in ((col1, 'csv'), (col2, 'txt')):
+            with column:
+                st.download_button(
+                    label=f"Download {fmt.upper()}",
+                    data=lambda fmt=fmt: export_cache.export_bytes(tokens_df, fmt, compress, not sort_ascending),
+                    file_name=export_name(date_str, expiry_text, fmt, compress),
+                    mime=export_mime(fmt, compress),
+                    on_click="ignore",
+                )
+        
+        # Display additional metrics
+        st.subheader("Summary")
+        st.write(f"Total tokens: {len(result_df)}")
+        st.write(f"- Futures: {futures_count}")
+        st.write(f"- Call Options (CE): {ce_count}")
+        st.write(f"- Put Options (PE): {pe_count}")
+        st.write(f"Analysis parameters: Date={run_date}, Expiry={expiry_text}, OI Threshold={run_oi}, ATM Deviation={run_atm}%")
+        if run_exclude:
+            st.write(f"Excluded: {', '.join(sorted(run_exclude))}")
+        st.write(f"Sorting: {'Ascending' if sort_ascending else 'Descending'} order")
+        
+        # Visualize distribution
+        st.subheader("Distribution")
+        chart_data = pd.DataFrame({
+            'Type': ['Futures', 'Call Options', 'Put Options'],
+            'Count': [futures_count, ce_count, pe_count]
+        })
+        st.bar_chart(chart_data.set_index('Type'))
+
+# Parameter sweep over a grid of OI thresholds and ATM percentages
+with st.expander("Parameter Sweep"):
+    sweep_oi = st.slider("OI Threshold Range", min_value=1, max_value=100, value=(1, 50))
+    sweep_atm = st.slider("ATM Range Percentage Range", min_value=1, max_value=20, value=(1, 20))
+    # The sweep follows the sidebar as it is now, not the last Generate
+    st.caption(f"Sweeping {date} {selected_expiry.title()}; token diffs are relative to the sidebar's "
+               f"OI Threshold={oi_threshold}, ATM Range={atm_percentage}%")
+
+    if st.button("Run Sweep"):
+        date_obj = datetime.datetime.combine(date, datetime.time())
+        with st.spinner("Sweeping parameters..."):
+            try:
+                data = store.load(date_obj)
+                grid, error = sweep_tokens(
+                    data, selected_expiry,
+                    range(sweep_oi[0], sweep_oi[1] + 1),
+                    range(sweep_atm[0], sweep_atm[1] + 1),
+                    baseline=(oi_threshold, atm_percentage),
+                    exclude=exclude,
+                )
+            except Exception as e:
+                grid, error = None, f"Error: {str(e)}"
+        if error:
+            st.error(error)
+        else:
+            st.session_state.token_sweep = (date_obj, selected_expiry, oi_threshold, atm_percentage, exclude, grid)
+
+    if 'token_sweep' in st.session_state:
+        sweep_date, sweep_expiry, base_oi, base_atm, sweep_exclude, grid = st.session_state.token_sweep
+
+        st.write("Total tokens (rows: ATM %, columns: OI threshold)")
+        st.dataframe(grid.pivot(index='atm_percentage', columns='oi_threshold', values='total'))
+        st.dataframe(grid, hide_index=True)
+
+        # Inspect the token-set diff of a single grid point
+        point_oi = st.selectbox("OI Threshold", grid['oi_threshold'].unique())
+        point_atm = st.selectbox("ATM Range Percentage", grid['atm_percentage'].unique())
+        # Built once per swept date, expiry and exclusions, not on every selectbox rerun
+        sweep_key = (sweep_date, sweep_expiry, sweep_exclude)
+        kept = st.session_state.get('token_sweep_index')
+        if kept is None or kept[0] != sweep_key:
+            kept = (sweep_key, TokenSweep(store.load(sweep_date), sweep_expiry, sweep_exclude))
+            st.session_state.token_sweep_index = kept
+        sweep = kept[1]
+        added, removed = sweep.diff((point_oi, point_atm), (base_oi, base_atm))
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(f"Added tokens: {len(added)}")
+            st.dataframe(pd.DataFrame({'All Columns': added}), hide_index=True)
+        with col2:
+            st.write(f"Removed tokens: {len(removed)}")
+            st.dataframe(pd.DataFrame({'All Columns': removed}), hide_index=True)
+
+# Show result cache counters
+cache_stats = token_cache.stats()
+st.sidebar.caption(f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+# Add explanatory information
+with st.expander("About Stock CR Token "):
+    st.info(f"""
+    This tool retrieves NSE derivatives data for a selected date and applies filters based on:
+    - Selected expiry (near, next or far monthly contract)
+    - Open Interest threshold
+    - ATM conditions (user-defined deviation from underlying price)
+    - PE/CE conditions
+    
+    The result is a list of derivative tokens for trading strategies, including futures contracts.
+    """)
+    
+    st.subheader("How ATM Range Percentage")
+    st.info(f"""
+    The ATM (At-The-Money) range percentage defines how far away from the underlying price a strike will be inculed in token without considering the oi beyoun this only strike wiht oi equal or greater than the thresold will be inculed in the token:
+    
+    - For a {atm_percentage}% setting, strikes that are more than {atm_percentage}% above or below the underlying price will be filtered based on oi.
+    - Lower percentage = stricter filtering (closer to the money)
+    - Higher percentage = looser filtering (includes strikes further from the money)
+    
+    
+    """)
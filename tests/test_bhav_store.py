@@ -0,0 +1,96 @@
+import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.bench_token_engine import legacy_run_analysis
+from benchmarks.synthetic import make_bhav_copy
+from trading_tools.bhav_store import BhavCopyStore, directory_fetcher, frame_digest, normalize_dtypes
+from trading_tools.token_engine import generate_tokens
+
+DATA_DIR = Path(__file__).parent / 'data'
+FIXTURE = DATA_DIR / 'BhavCopy_NSE_FO_0_0_0_20250115_F_0000.csv'
+TRADE_DATE = datetime.date(2025, 1, 15)
+
+
+class CountingFetcher:
+    """Fetcher returning ``data`` for every date and counting its calls."""
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def __call__(self, trade_date):
+        self.calls.append(trade_date)
+        return self.data
+
+
+def test_round_trip_fetches_once(tmp_path):
+    fetch = CountingFetcher(make_bhav_copy(2000, trade_date=TRADE_DATE))
+    first = BhavCopyStore(tmp_path, fetcher=fetch).load(TRADE_DATE)
+    assert TRADE_DATE in BhavCopyStore(tmp_path, fetcher=fetch)
+
+    # A new store has nothing in memory, so this load reads the Parquet file
+    again = BhavCopyStore(tmp_path, fetcher=fetch).load('2025-01-15')
+    assert len(fetch.calls) == 1
+    pd.testing.assert_frame_equal(again, first)
+
+
+def test_digest_survives_the_file(tmp_path):
+    fetch = CountingFetcher(make_bhav_copy(2000, trade_date=TRADE_DATE))
+    written = BhavCopyStore(tmp_path, fetcher=fetch).load(TRADE_DATE)
+    loaded = BhavCopyStore(tmp_path, fetcher=fetch).load(datetime.datetime(2025, 1, 15))
+    assert frame_digest(loaded) == frame_digest(written)
+    # The digest is registered, not carried in attrs that derived frames would inherit
+    assert loaded.attrs == {} and written.attrs == {}
+    assert frame_digest(loaded.copy()) == frame_digest(loaded)
+
+    changed = loaded.copy()
+    changed.loc[changed.index[0], 'ClsPric'] += 1
+    assert frame_digest(changed) != frame_digest(loaded)
+    assert frame_digest(loaded.iloc[:100]) != frame_digest(loaded)
+
+
+def test_memory_serves_the_same_frame(tmp_path):
+    fetch = CountingFetcher(make_bhav_copy(2000, trade_date=TRADE_DATE))
+    store = BhavCopyStore(tmp_path, fetcher=fetch)
+    assert store.load(TRADE_DATE) is store.load('2025-01-15')
+    assert len(fetch.calls) == 1
+
+
+def test_empty_fetches_are_not_cached(tmp_path):
+    for empty in (pd.DataFrame(), None):
+        fetch = CountingFetcher(empty)
+        store = BhavCopyStore(tmp_path, fetcher=fetch)
+        for _ in range(2):
+            assert store.load(TRADE_DATE).empty
+        assert len(fetch.calls) == 2
+        assert TRADE_DATE not in store
+        assert not list(tmp_path.glob('*.parquet'))
+
+
+def test_evict_trims_to_max_bytes(tmp_path):
+    store = BhavCopyStore(tmp_path, fetcher=CountingFetcher(make_bhav_copy(2000)), max_bytes=1, memory_items=0)
+    store.load(TRADE_DATE)
+    assert TRADE_DATE not in store
+
+
+def test_directory_fetcher_reads_a_checked_in_copy(tmp_path):
+    store = BhavCopyStore(tmp_path, fetcher=directory_fetcher(DATA_DIR))
+    data = store.load(TRADE_DATE)
+
+    expected = normalize_dtypes(pd.read_csv(FIXTURE))
+    pd.testing.assert_frame_equal(data, expected)
+    pd.testing.assert_frame_equal(BhavCopyStore(tmp_path, fetcher=None).load(TRADE_DATE), expected)
+
+    # Tokens from the stored copy are the ones the legacy filter gives on the CSV
+    legacy, _ = legacy_run_analysis(pd.read_csv(FIXTURE), 'FEB', 4, 8)
+    result, error = generate_tokens(data, 'FEB', 4, 8)
+    assert error is None and len(result)
+    assert result['All Columns'].tolist() == legacy['All Columns'].tolist()
+
+
+def test_directory_fetcher_misses_are_empty(tmp_path):
+    store = BhavCopyStore(tmp_path, fetcher=directory_fetcher(DATA_DIR))
+    assert store.load(datetime.date(2025, 1, 16)).empty
+    assert not list(tmp_path.glob('*.parquet'))
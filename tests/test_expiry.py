@@ -0,0 +1,33 @@
+import datetime
+
+from benchmarks.synthetic import make_bhav_copy
+from trading_tools.expiry import expiry_label
+from trading_tools.instrument_index import instrument_index
+
+
+def resolver(trade_date):
+    return instrument_index(make_bhav_copy(3000, trade_date=trade_date)).expiries
+
+
+def test_month_names_roll_into_next_year():
+    expiries = resolver(datetime.date(2025, 11, 14))
+    assert expiries.resolve('NOV') == datetime.date(2025, 11, 27)
+    assert expiries.resolve('jan') == datetime.date(2026, 1, 29)
+    assert expiries.resolve('DEC') == datetime.date(2025, 12, 25)
+    assert expiries.resolve('JUL') is None
+
+
+def test_live_expiries_on_the_near_expiry_day():
+    # The bhav copy of an expiry day still lists the contracts expiring that day
+    expiries = resolver(datetime.date(2025, 1, 30))
+    expected = [datetime.date(2025, 1, 30), datetime.date(2025, 2, 27), datetime.date(2025, 3, 27)]
+    assert [expiries.resolve(live) for live in ('NEAR', 'NEXT', 'FAR')] == expected
+    assert list(expiries.live('STK0000').values()) == expected
+    assert expiries.table().set_index('underlying').loc['STK0000', 'near'].date() == expected[0]
+
+
+def test_dates_resolve_as_given():
+    expiries = resolver(datetime.date(2025, 1, 15))
+    assert expiries.resolve('2025-02-27') == datetime.date(2025, 2, 27)
+    assert expiries.resolve(datetime.datetime(2025, 2, 27, 15, 30)) == datetime.date(2025, 2, 27)
+    assert expiry_label(datetime.date(2025, 1, 30)) == '30-JAN-2025'
@@ -0,0 +1,52 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_bhav_copy
+from trading_tools.instrument_index import InstrumentIndex, instrument_index
+
+
+def test_rows_are_sorted_and_grouped_by_expiry():
+    data = make_bhav_copy(5000)
+    index = InstrumentIndex(data)
+    assert len(index) == len(data)
+
+    frame = index.frame
+    assert frame.equals(frame.sort_values(['underlying', 'expiry', 'strike'], kind='stable'))
+    rows = index.rows_for_expiry(datetime.date(2025, 2, 27))
+    assert len(rows) and (np.diff(rows) > 0).all()
+    assert pd.Series(index.name[rows]).str.contains('25FEB').all()
+    assert len(index.rows_for_expiry(datetime.date(2025, 2, 28))) == 0
+    assert len(index.rows_for_expiry(None)) == 0
+
+
+def test_udiff_columns_and_names_give_the_same_index():
+    data = make_bhav_copy(5000)
+    from_columns = InstrumentIndex(data)
+    from_names = InstrumentIndex(data.drop(columns=['TckrSymb', 'OptnTp']))
+    assert from_columns.frame.equals(from_names.frame)
+    assert (from_columns.name == from_names.name).all()
+    assert (from_columns.stem == from_names.stem).all()
+
+
+def test_unparsed_names_are_not_indexed():
+    data = make_bhav_copy(2000).drop(columns=['TckrSymb', 'OptnTp'])
+    data.loc[data.index[:3], 'FinInstrmNm'] = 'NOT A CONTRACT'
+    assert len(InstrumentIndex(data)) == len(data) - 3
+
+
+def test_rows_without_a_contract_type_or_expiry_are_not_indexed():
+    data = make_bhav_copy(2000)
+    data['OptnTp'] = data['OptnTp'].astype(object)
+    data['XpryDt'] = data['XpryDt'].astype(object)
+    options = data.index[data['OptnTp'].isin(['CE', 'PE'])]
+    data.loc[options[:2], 'OptnTp'] = 'XX'
+    data.loc[options[2:3], 'XpryDt'] = None
+    assert len(InstrumentIndex(data)) == len(data) - 3
+
+
+def test_index_is_built_once_per_copy():
+    data = make_bhav_copy(2000)
+    assert instrument_index(data) is instrument_index(data)
+    assert instrument_index(make_bhav_copy(2000, seed=1)) is not instrument_index(data)
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from trading_tools.m2m_chart import bucket_m2m, m2m_figure
+
+M2M = pd.Series(range(-250, 250), index=[f"S{i:03d}" for i in range(500)], dtype=float)
+
+
+def test_buckets_keep_both_ends_and_the_total():
+    bucketed = bucket_m2m(M2M, top=3, bottom=2)
+    assert bucketed.index.tolist() == ['S000', 'S001', 'Others (495)', 'S497', 'S498', 'S499']
+    assert bucketed.sum() == M2M.sum()
+    assert len(bucket_m2m(M2M.iloc[:6], top=3, bottom=2)) == 6
+
+
+def test_figure_is_bucketed_unless_every_symbol_is_asked_for():
+    bars = m2m_figure(M2M, top=10, bottom=10).data[0]
+    assert bars.type == 'bar' and len(bars.x) == 21
+
+    every = m2m_figure(M2M, top=None, webgl_rows=100).data[0]
+    assert every.type == 'scattergl' and len(every.x) == len(M2M)
@@ -0,0 +1,50 @@
+import datetime
+
+from trading_tools.margin_cache import MarginCache
+from trading_tools.span_margin import STRATEGY
+
+DAY = datetime.date(2025, 3, 3)
+NEXT_DAY = datetime.date(2025, 3, 4)
+
+
+def test_cache_is_keyed_on_trade_date(tmp_path):
+    cache = MarginCache(tmp_path / 'margins.sqlite')
+    cache.store([('ABC', '27-MAR-2025', 100, 12345.5), ('XYZ', '27-MAR-2025', 50, None)], DAY, STRATEGY,
+                'calculator')
+
+    # Expiries match whatever form they are given in
+    keys = [('ABC', '2025-03-27', 100), ('XYZ', '27-MAR-2025', 50)]
+    assert cache.lookup(keys, DAY, STRATEGY, 'calculator') == [12345.5, None]
+    assert cache.lookup(keys, NEXT_DAY, STRATEGY, 'calculator') == [None, None]
+    assert cache.lookup(keys, DAY, STRATEGY, 'span') == [None, None]
+    assert (cache.hits, cache.misses) == (1, 5)
+
+    assert cache.purge(NEXT_DAY) == 1
+    assert cache.stats()['size'] == 0
+
+
+def test_cache_drops_margins_of_other_risk_parameters(tmp_path):
+    cache = MarginCache(tmp_path / 'margins.sqlite')
+    cache.store([('ABC', '27-MAR-2025', 100, 1.0)], DAY, STRATEGY, 'calculator', params='old')
+    assert cache.lookup([('ABC', '27-MAR-2025', 100)], DAY, STRATEGY, 'calculator', params='new') == [None]
+
+    cache.store([('XYZ', '27-MAR-2025', 50, 2.0)], DAY, STRATEGY, 'calculator', params='new')
+    assert cache.lookup([('ABC', '27-MAR-2025', 100)], DAY, STRATEGY, 'calculator', params='old') == [None]
+
+
+def test_purge_drops_expired_contracts(tmp_path):
+    cache = MarginCache(tmp_path / 'margins.sqlite')
+    cache.store([('ABC', '2025-03-01', 100, 1.0), ('XYZ', '2025-03-27', 50, 2.0)], DAY, STRATEGY, 'calculator')
+    assert cache.purge(DAY) == 1
+    assert cache.lookup([('XYZ', '2025-03-27', 50)], DAY, STRATEGY, 'calculator') == [2.0]
+
+
+def test_rows_that_cannot_be_keyed_are_misses(tmp_path):
+    cache = MarginCache(tmp_path / 'margins.sqlite')
+    rows = [('ABC', '27/03/2025', 100, 1.0), ('XYZ', '27-MAR-2025', float('nan'), 2.0),
+            ('LMN', '27-MAR-2025', None, 3.0), ('PQR', '27-MAR-2025', 75, 4.0)]
+    assert cache.store(rows, DAY, STRATEGY, 'calculator') == 1
+
+    keys = [row[:3] for row in rows]
+    assert cache.lookup(keys, DAY, STRATEGY, 'calculator') == [None, None, None, 4.0]
+    assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,31 @@
+import datetime
+
+from trading_tools.margin_journal import MarginJournal, journal_key
+
+DAY = datetime.date(2025, 3, 3)
+NEXT_DAY = datetime.date(2025, 3, 4)
+
+
+def test_journal_is_keyed_on_trade_date(tmp_path):
+    path = tmp_path / 'batch.journal.jsonl'
+    MarginJournal(path, DAY).append('ABC', '27-MAR-2025', 100, 12345.5, seconds=1.5)
+
+    assert list(MarginJournal(path, DAY).completed()) == [journal_key('ABC', '27-MAR-2025', 100.0)]
+    assert MarginJournal(path, NEXT_DAY).completed() == {}
+
+
+def test_journal_keeps_the_last_outcome_and_skips_partial_lines(tmp_path):
+    path = tmp_path / 'batch.journal.jsonl'
+    journal = MarginJournal(path, DAY)
+    journal.append('ABC', '27-MAR-2025', 100, 1.0)
+    journal.append('ABC', '27-MAR-2025', 100, None, error='TimeoutError')
+    journal.append('XYZ', '27-MAR-2025', 50, None, error='TimeoutError')
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write('{"trade_date": "2025-03-03", "sto')
+    journal.append('XYZ', '27-MAR-2025', 50, 2.0)
+
+    done = journal.completed()
+    assert list(done) == [journal_key('XYZ', '27-MAR-2025', 50)]
+    assert done[journal_key('XYZ', '27-MAR-2025', 50)]['margin'] == 2.0
+    journal.remove()
+    assert not path.exists()
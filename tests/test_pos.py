@@ -0,0 +1,83 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_pos_sheet
+from trading_tools.pos import (EXPOSURE_COLUMN, M2M_COLUMN, QTY_COLUMN, STRIKE_COLUMN, SYMBOL_COLUMN,
+                               TYPE_COLUMN, detect_schema, read_pos_file)
+
+
+def csv_upload(frame, name='pos.csv'):
+    buffer = io.BytesIO(frame.to_csv(index=False).encode())
+    buffer.name = name
+    return buffer
+
+
+def xlsx_upload(frame, name='pos.xlsx'):
+    buffer = io.BytesIO()
+    frame.to_excel(buffer, index=False)
+    buffer.name = name
+    buffer.seek(0)
+    return buffer
+
+
+def test_standard_export_layout():
+    header = [f'Unnamed: {i}' for i in range(18)]
+    sample = make_pos_sheet(50).set_axis(range(18), axis=1)
+    assert detect_schema(header, sample) == {
+        SYMBOL_COLUMN: 0, TYPE_COLUMN: 7, QTY_COLUMN: 9, EXPOSURE_COLUMN: 15, M2M_COLUMN: 17}
+
+
+def test_captioned_header_in_any_order():
+    header = ['Account', 'MTM', 'Scrip', 'Strike Price', 'Opt Type', 'Exposure', 'Net Quantity']
+    sample = pd.DataFrame([['ACC01', 10.0, 'ABC', 100, 'CE', 5.0, -250]], columns=range(7))
+    assert detect_schema(header, sample) == {
+        SYMBOL_COLUMN: 2, TYPE_COLUMN: 4, QTY_COLUMN: 6, EXPOSURE_COLUMN: 5, M2M_COLUMN: 1, STRIKE_COLUMN: 3}
+
+
+def test_uncaptioned_layout_shifted_with_the_type_column():
+    # Two extra leading columns push every field two places right
+    sheet = make_pos_sheet(50)
+    shifted = pd.concat([pd.DataFrame({'a': np.nan, 'b': np.nan}, index=sheet.index), sheet], axis=1)
+    header = [None] * shifted.shape[1]
+    schema = detect_schema(header, shifted.set_axis(range(shifted.shape[1]), axis=1))
+    assert schema == {SYMBOL_COLUMN: 2, TYPE_COLUMN: 9, QTY_COLUMN: 11, EXPOSURE_COLUMN: 17, M2M_COLUMN: 19}
+
+
+def test_missing_type_column_is_reported():
+    with pytest.raises(ValueError, match='Could not locate'):
+        detect_schema([None] * 3, pd.DataFrame([[1, 2, 3]]))
+
+
+def test_header_variants_read_the_same_positions():
+    sheet = make_pos_sheet(100)
+    standard = read_pos_file(csv_upload(sheet))
+
+    captioned = sheet.rename(columns={'Unnamed: 0': 'Symbol', 'Unnamed: 7': 'Type', 'Unnamed: 9': 'Net Qty',
+                                      'Unnamed: 15': 'Exposure', 'Unnamed: 17': 'M2M'})
+    # Captions in the header row and the columns in reverse order
+    captioned = captioned[list(captioned.columns[::-1])]
+    reordered = read_pos_file(csv_upload(captioned))
+
+    pd.testing.assert_frame_equal(reordered, standard)
+    assert len(standard) == 60
+    assert standard[TYPE_COLUMN].value_counts().to_dict() == {'FX': 20, 'CE': 20, 'PE': 20}
+    assert standard[QTY_COLUMN].dtype == 'int64'
+
+
+@pytest.mark.parametrize('engine', ['openpyxl', 'calamine'])
+def test_workbook_engines_agree_with_csv(engine):
+    sheet = make_pos_sheet(100)
+    workbook = read_pos_file(xlsx_upload(sheet), engine=engine)
+    pd.testing.assert_frame_equal(workbook, read_pos_file(csv_upload(sheet)))
+
+
+@pytest.mark.parametrize('upload', [csv_upload, xlsx_upload])
+def test_header_only_export_has_no_positions(upload):
+    header = pd.DataFrame(columns=['Symbol', 'Type', 'Net Qty', 'Exposure', 'M2M'])
+    positions = read_pos_file(upload(header))
+    assert positions.empty
+    assert list(positions.columns) == list(read_pos_file(csv_upload(make_pos_sheet(10))).columns)
+    assert positions[QTY_COLUMN].dtype == 'int64'
@@ -0,0 +1,51 @@
+import io
+
+import pandas as pd
+
+from trading_tools.pos import SYMBOL_COLUMN, read_pos_file
+from trading_tools.pos_accounts import (ACCOUNT_COLUMN, account_breakdown, account_id, account_mismatches,
+                                        combine_accounts, parse_files)
+
+ACC1 = b"""Symbol,Type,Net Qty,Exposure,M2M
+ABC,FX,-500,100000,10
+ABC,CE,500,0,-5
+ABC,PE,-500,0,2
+"""
+ACC2 = b"""Symbol,Type,Net Qty,Exposure,M2M
+ABC,FX,250,50000,1
+ABC,CE,-250,0,1
+ABC,PE,500,0,1
+XYZ,FX,100,20000,0
+XYZ,CE,-100,0,0
+XYZ,PE,100,0,0
+"""
+UPLOADS = [('ACC1_pos.csv', ACC1), ('ACC2_pos.csv', ACC2)]
+
+
+def book():
+    books = [read_pos_file(io.BytesIO(data), name=name) for name, data in UPLOADS]
+    return combine_accounts([(account_id(name), positions) for (name, _), positions in zip(UPLOADS, books)])
+
+
+def test_same_symbol_in_two_accounts():
+    combined = book()
+    assert len(combined) == 9
+    assert list(combined[SYMBOL_COLUMN].cat.categories) == ['ABC', 'XYZ']
+    assert combined.groupby(ACCOUNT_COLUMN, observed=True).size().to_dict() == {'ACC1_pos': 3, 'ACC2_pos': 6}
+
+    breakdown = account_breakdown(combined)
+    assert breakdown.loc['ACC1_pos', ['FX', 'CE', 'PE']].tolist() == [-500, 500, -500]
+    assert breakdown['matched'].to_dict() == {'ACC1_pos': True, 'ACC2_pos': False}
+
+    # Only ACC2's ABC is off; netting ABC across accounts would hide which one
+    mismatched = account_mismatches(combined)
+    assert list(mismatched.index) == [('ACC2_pos', 'ABC')]
+    assert mismatched.loc[('ACC2_pos', 'ABC'), 'pe_gap'] == 250
+
+
+def test_parse_files_keeps_input_order():
+    inline = parse_files(UPLOADS, workers=1)
+    pooled = parse_files(UPLOADS, workers=2)
+    for one, other in zip(inline, pooled):
+        pd.testing.assert_frame_equal(one, other)
+    assert [len(positions) for positions in pooled] == [3, 6]
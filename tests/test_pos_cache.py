@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.synthetic import make_pos_sheet
+from trading_tools.pos_cache import PosFileCache, snapshot_nbytes, upload_key
+
+
+def csv_bytes(n_rows=100, seed=0):
+    return make_pos_sheet(n_rows, seed=seed).to_csv(index=False).encode()
+
+
+def test_keyed_on_content_and_extension():
+    data = csv_bytes()
+    cache = PosFileCache()
+    first = cache.snapshot(data, 'monday.csv')
+    # Same bytes under another name are the same upload
+    assert cache.snapshot(bytes(data), 'renamed.CSV') is first
+    assert cache.snapshot(csv_bytes(seed=1), 'monday.csv') is not first
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+    assert upload_key(data, 'a.csv') == upload_key(data, 'b.csv')
+    assert upload_key(data, 'a.csv') != upload_key(data, 'a.xlsx')
+
+
+def test_bounded_by_bytes():
+    probe = PosFileCache().snapshot(csv_bytes(), 'pos.csv')
+    nbytes = snapshot_nbytes(probe)
+
+    cache = PosFileCache(max_bytes=int(nbytes * 1.5))
+    first = cache.snapshot(csv_bytes(), 'pos.csv')
+    cache.snapshot(csv_bytes(seed=1), 'pos.csv')
+    stats = cache.stats()
+    assert stats['size'] == 1 and stats['nbytes'] <= stats['max_bytes']
+    # The older entry was evicted, so this parses again
+    assert cache.snapshot(csv_bytes(), 'pos.csv') is not first
+
+    # A snapshot over the whole budget is returned but not kept
+    tiny = PosFileCache(max_bytes=nbytes - 1)
+    assert tiny.snapshot(csv_bytes(), 'pos.csv') is not None
+    assert tiny.stats()['size'] == 0
+
+
+def shared_cache_stats(**env):
+    code = "from trading_tools.pos_cache import pos_cache; s = pos_cache.stats(); print(s['maxsize'], s['max_bytes'])"
+    environ = {key: value for key, value in os.environ.items() if not key.startswith('POS_CACHE_')}
+    result = subprocess.run([sys.executable, '-c', code], env={**environ, **env}, cwd=Path(__file__).parents[1],
+                            capture_output=True, text=True, check=True)
+    return tuple(int(value) for value in result.stdout.split())
+
+
+def test_shared_cache_bounds_from_the_environment():
+    assert shared_cache_stats() == (16, 256 * 1024 * 1024)
+    assert shared_cache_stats(POS_CACHE_ITEMS='3', POS_CACHE_MAX_MB='0.5') == (3, 512 * 1024)
@@ -0,0 +1,87 @@
+import io
+
+import pandas as pd
+
+from trading_tools.pos import read_pos_file
+from trading_tools.pos_accounts import ACCOUNT_COLUMN, combine_accounts
+from trading_tools.pos_snapshot import PosSnapshot, diff_positions, position_changes
+
+OLD = """Symbol,Type,Strike,Net Qty,Exposure,M2M
+ABC,FX,,-500,100000,10
+ABC,CE,100,500,0,-5
+ABC,PE,100,-500,0,2
+XYZ,FX,,250,50000,1
+XYZ,CE,40,-250,0,1
+XYZ,PE,40,250,0,1
+"""
+# ABC's CE is rolled to a new strike and its PE cut; XYZ is closed; LMN is new
+NEW = """Symbol,Type,Strike,Net Qty,Exposure,M2M
+ABC,FX,,-500,100000,12
+ABC,CE,110,500,0,-1
+ABC,PE,100,-250,0,2
+LMN,FX,,100,20000,0
+"""
+# The same legs held in two accounts
+LEGS = """Symbol,Type,Strike,Net Qty,Exposure,M2M
+ABC,FX,,-500,100000,10
+ABC,CE,100,500,0,-5
+"""
+
+
+def positions(book):
+    buffer = io.BytesIO(book.encode())
+    buffer.name = 'pos.csv'
+    return read_pos_file(buffer)
+
+
+def statuses(diff):
+    keys = zip(diff['symbol'].astype(str), diff['type'].astype(str), diff['strike'].fillna(0), diff['status'])
+    return {(symbol, kind, strike): status for symbol, kind, strike, status in keys}
+
+
+def test_added_removed_and_changed_legs():
+    diff = diff_positions(positions(OLD), positions(NEW))
+    assert statuses(diff) == {
+        ('ABC', 'FX', 0): 'unchanged',
+        ('ABC', 'CE', 100): 'removed',
+        ('ABC', 'CE', 110): 'added',
+        ('ABC', 'PE', 100): 'changed',
+        ('XYZ', 'FX', 0): 'removed',
+        ('XYZ', 'CE', 40): 'removed',
+        ('XYZ', 'PE', 40): 'removed',
+        ('LMN', 'FX', 0): 'added',
+    }
+    changed = diff[diff['status'] == 'changed'].iloc[0]
+    assert (changed['qty_old'], changed['qty_new']) == (-500, -250)
+
+
+def test_update_matches_a_fresh_snapshot():
+    new = positions(NEW)
+    snapshot, changes = PosSnapshot(positions(OLD)).update(new)
+    fresh = PosSnapshot(new)
+    pd.testing.assert_frame_equal(snapshot.totals, fresh.totals, check_dtype=False)
+    pd.testing.assert_frame_equal(snapshot.reconciled, fresh.reconciled)
+    assert len(changes) == 7
+    assert changes.loc[changes['status'] == 'changed', 'qty_change'].tolist() == [250]
+
+
+def accounts(*books):
+    return combine_accounts([(account, positions(book)) for account, book in books])
+
+
+def test_legs_are_keyed_on_account():
+    old = accounts(('ACC1', LEGS), ('ACC2', LEGS))
+    # Same files in the other order: identical legs must not pair across accounts
+    assert set(diff_positions(old, accounts(('ACC2', LEGS), ('ACC1', LEGS)))['status']) == {'unchanged'}
+
+    new = accounts(('ACC1', LEGS.replace('ABC,CE,100,500', 'ABC,CE,100,250')), ('ACC3', LEGS))
+    diff = diff_positions(old, new)
+    keyed = zip(diff[ACCOUNT_COLUMN].astype(str), diff['type'].astype(str), diff['status'])
+    assert sorted(keyed) == [
+        ('ACC1', 'CE', 'changed'), ('ACC1', 'FX', 'unchanged'),
+        ('ACC2', 'CE', 'removed'), ('ACC2', 'FX', 'removed'),
+        ('ACC3', 'CE', 'added'), ('ACC3', 'FX', 'added'),
+    ]
+    changes = position_changes(old, new)
+    assert changes.columns[0] == ACCOUNT_COLUMN
+    assert changes[ACCOUNT_COLUMN].astype(str).tolist() == ['ACC1', 'ACC2', 'ACC2', 'ACC3', 'ACC3']
@@ -0,0 +1,48 @@
+import io
+
+import pandas as pd
+
+from trading_tools.pos import read_pos_file
+from trading_tools.reconcile import mismatched_symbols, reconcile
+
+BOOK = """Symbol,Type,Net Qty,Exposure,M2M
+ABC,FX,-500,100000,10
+ABC,CE,250,0,-5
+ABC,CE,250,0,-5
+ABC,PE,-500,0,2
+XYZ,FX,250,50000,1
+XYZ,CE,-250,0,1
+XYZ,PE,750,0,1
+LMN,FX,100,20000,0
+"""
+
+
+def positions():
+    buffer = io.BytesIO(BOOK.encode())
+    buffer.name = 'pos.csv'
+    return read_pos_file(buffer)
+
+
+def test_net_quantities_and_gaps_per_symbol():
+    result = reconcile(positions())
+    assert result.loc['ABC'].tolist() == [-500, 500, -500, 0, 0, True]
+    assert result.loc['XYZ'].tolist() == [250, -250, 750, 0, 500, False]
+    # A symbol without option legs is short of both
+    assert result.loc['LMN'].tolist() == [100, 0, 0, -100, -100, False]
+
+
+def test_mismatched_symbols_largest_gap_first():
+    mismatched = mismatched_symbols(positions())
+    assert list(mismatched.index) == ['XYZ', 'LMN']
+    assert 'matched' not in mismatched.columns
+
+
+def test_reconcile_by_account():
+    book = positions()
+    book['account'] = pd.Categorical(['A', 'A', 'B', 'A', 'A', 'A', 'A', 'A'])
+    result = reconcile(book, by=['account'])
+    assert result.index.names == ['account', 'symbol']
+    # Half of ABC's CE sits in account B, so ABC matches in neither account
+    assert result.loc[('A', 'ABC')].tolist() == [-500, 250, -500, -250, 0, False]
+    assert result.loc[('B', 'ABC')].tolist() == [0, 250, 0, 250, 0, False]
+    assert result.loc[('A', 'XYZ'), 'pe_gap'] == 500
@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.synthetic import make_bhav_copy
+from trading_tools.result_cache import TokenResultCache
+from trading_tools.token_engine import generate_tokens
+
+
+@pytest.fixture(scope='module')
+def data():
+    return make_bhav_copy(5000)
+
+
+def test_same_inputs_return_the_stored_frame(data):
+    cache = TokenResultCache()
+    first, error = cache.tokens(data, 'FEB', 4, 8)
+    again, _ = cache.tokens(data.copy(), 'FEB', 4.0, 8.0)
+    assert error is None and again is first
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 32}
+
+    expected, _ = generate_tokens(data, 'FEB', 4, 8)
+    assert first['All Columns'].tolist() == expected['All Columns'].tolist()
+
+
+def test_changed_parameters_or_data_miss(data):
+    cache = TokenResultCache()
+    first, _ = cache.tokens(data, 'FEB', 4, 8)
+    assert cache.tokens(data, 'FEB', 5, 8)[0] is not first
+    assert cache.tokens(data, 'MAR', 4, 8)[0] is not first
+
+    assert cache.tokens(make_bhav_copy(5000, seed=1), 'FEB', 4, 8)[0] is not first
+    assert cache.stats()['misses'] == 4
+
+
+def test_subset_of_a_cached_copy_misses(data):
+    cache = TokenResultCache()
+    full, _ = cache.tokens(data, 'FEB', 4, 8)
+    subset = data[data['TckrSymb'] == 'STK0001']
+    tokens, _ = cache.tokens(subset, 'FEB', 4, 8)
+    assert tokens is not full
+    assert tokens['All Columns'].tolist() == generate_tokens(subset, 'FEB', 4, 8)[0]['All Columns'].tolist()
+    assert cache.stats()['misses'] == 2
+
+
+def test_lru_bound(data):
+    cache = TokenResultCache(maxsize=2)
+    for month in ('JAN', 'FEB', 'MAR'):
+        cache.tokens(data, month, 4, 8)
+    cache.tokens(data, 'JAN', 4, 8)
+    assert cache.stats()['size'] == 2
+    assert cache.stats()['hits'] == 0
@@ -0,0 +1,70 @@
+import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_tools.span_margin import LEG_COLUMNS, SpanParameters, compute_margins
+
+DATA_DIR = Path(__file__).parent / 'data'
+EXPIRY = datetime.date(2025, 3, 27)
+
+
+@pytest.fixture(scope='module')
+def params():
+    return SpanParameters.from_files(DATA_DIR / 'nsccl.20250313.s.spn', DATA_DIR / 'ael_13032025.csv')
+
+
+def legs(*rows):
+    return pd.DataFrame([(i, 'ABC', pd.Timestamp(EXPIRY), kind, strike, qty)
+                         for i, (kind, strike, qty) in enumerate(rows)], columns=LEG_COLUMNS)
+
+
+def test_risk_arrays_and_underlying_values(params):
+    assert params.contracts[['kind', 'strike', 'price']].fillna(0).values.tolist() == [
+        ['FUT', 0, 1002.0], ['PE', 1000.0, 25.0]]
+    assert params.risk.shape == (2, 16)
+    assert params.risk[1, [0, 13, 15]].tolist() == [9.0, -14.0, -5.0]
+    assert params.underlyings.loc['ABC'].tolist() == [1000.0, 5.0]
+    assert params.exposure['ABC'] == 3.5
+
+
+def test_one_contract_scan_risk_som_and_exposure(params):
+    result = compute_margins(params, legs(('PE', 1000.0, -100), ('FUT', np.nan, 100)))
+
+    # Short 100 puts: the worst scenario is the -14 loss of a long put, turned
+    # around; the SOM is 5 a unit and the premium received is 100 x 25
+    short_put = result.loc[0]
+    assert short_put['scan_risk'] == pytest.approx(1400)
+    assert short_put['som'] == pytest.approx(500)
+    assert short_put['nov'] == pytest.approx(-2500)
+    assert short_put['span'] == pytest.approx(1400 + 2500)
+    # Exposure on short options is taken on the underlying's value
+    assert short_put['exposure'] == pytest.approx(100 * 1000 * 0.035)
+    assert short_put['total'] == pytest.approx(3900 + 3500)
+
+    # Long 100 futures: worst scenario loss 80 a unit, exposure on the future's value
+    future = result.loc[1]
+    assert future[['scan_risk', 'som', 'nov', 'span']].tolist() == pytest.approx([8000, 0, 0, 8000])
+    assert future['exposure'] == pytest.approx(100 * 1002 * 0.035)
+    assert result['error'].isna().all()
+
+
+def test_unknown_contract_makes_the_portfolio_an_error(params):
+    result = compute_margins(params, legs(('PE', 1050.0, -100)))
+    assert np.isnan(result.loc[0, 'total'])
+    assert result.loc[0, 'error'] == "no SPAN contract or lot size for ABC PE 1050"
+
+
+def test_contract_without_a_risk_array_is_an_error(tmp_path):
+    span = (DATA_DIR / 'nsccl.20250313.s.spn').read_text()
+    start, end = span.index('<ra>', span.index('<opt>')), span.index('</ra>', span.index('<opt>'))
+    path = tmp_path / 'nsccl.20250313.s.spn'
+    path.write_text(span[:start] + span[end + len('</ra>'):])
+    params = SpanParameters.from_files(path)
+
+    result = compute_margins(params, legs(('PE', 1000.0, -100), ('FUT', np.nan, 100)))
+    assert np.isnan(result.loc[0, 'total'])
+    assert result.loc[0, 'error'] == "no SPAN contract or lot size for ABC PE 1000"
+    assert result.loc[1, 'total'] == pytest.approx(8000)
@@ -0,0 +1,36 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_bhav_copy
+from trading_tools.sweep import TokenSweep
+from trading_tools.token_engine import generate_tokens
+
+THRESHOLDS = np.array([0, 1, 4, 10, 40])
+PERCENTAGES = np.array([1, 5, 8, 20])
+BASELINE = (4, 8)
+
+
+@pytest.fixture(scope='module')
+def data():
+    return make_bhav_copy(5000)
+
+
+@pytest.mark.parametrize('exclude', [(), ('STK0000',)])
+def test_every_grid_point_matches_generate_tokens(data, exclude):
+    sweep = TokenSweep(data, 'FEB', exclude)
+    grid = sweep.run(THRESHOLDS, PERCENTAGES, baseline=BASELINE)
+    assert len(grid) == len(THRESHOLDS) * len(PERCENTAGES)
+
+    baseline_tokens = Counter(generate_tokens(data, 'FEB', *BASELINE, exclude)[0]['All Columns'])
+    for point in grid.itertuples():
+        result, error = generate_tokens(data, 'FEB', point.oi_threshold, point.atm_percentage, exclude)
+        assert error is None
+        tokens = result['All Columns'].tolist()
+        assert tokens == sweep.tokens(point.oi_threshold, point.atm_percentage)['All Columns'].tolist()
+        assert len(tokens) == point.total == point.fut + point.ce + point.pe
+
+        added, removed = sweep.diff((point.oi_threshold, point.atm_percentage), BASELINE)
+        assert Counter(added) == Counter(tokens) - baseline_tokens and len(added) == point.added
+        assert Counter(removed) == baseline_tokens - Counter(tokens) and len(removed) == point.removed
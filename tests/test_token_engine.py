@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+
+from benchmarks.bench_token_engine import legacy_run_analysis
+from benchmarks.synthetic import make_bhav_copy
+from trading_tools.analysis import run_analysis
+from trading_tools.bhav_store import BhavCopyStore
+from trading_tools.result_cache import TokenResultCache
+from trading_tools.token_engine import generate_tokens, token_counts
+
+
+@pytest.fixture(scope='module')
+def data():
+    # Without next-year contracts the legacy month match selects one expiry
+    return make_bhav_copy(10_000, next_year=False)
+
+
+@pytest.mark.parametrize('month', ['JAN', 'FEB', 'MAR'])
+@pytest.mark.parametrize('oi_threshold, atm_percentage', [(4, 8), (1, 1), (10, 20)])
+def test_matches_legacy_filter(data, month, oi_threshold, atm_percentage):
+    legacy, legacy_error = legacy_run_analysis(data, month, oi_threshold, atm_percentage)
+    result, error = generate_tokens(data, month, oi_threshold, atm_percentage)
+    assert error is None and legacy_error is None
+    assert result['All Columns'].tolist() == legacy['All Columns'].tolist()
+
+
+def test_index_and_fractional_strikes_are_excluded(data):
+    result, _ = generate_tokens(data, 'FEB', 4, 8)
+    tokens = result['All Columns'].str.removeprefix('NRML|')
+    assert not tokens.str.contains('NIFTY').any()
+    assert not tokens.str.contains('.', regex=False).any()
+
+
+def test_errors_match_run_analysis(data):
+    assert generate_tokens(data.iloc[:0], 'FEB', 4, 8) == (None, "No data available for the selected date.")
+    assert generate_tokens(data, 'JUL', 4, 8) == (None, "No contracts found for JUL.")
+
+
+def test_expiry_selections_resolve_to_one_date(data):
+    result, error = generate_tokens(data, 'NEAR', 4, 8)
+    assert error is None and result.attrs['expiry'] == '2025-01-30'
+    by_date, _ = generate_tokens(data, '2025-01-30', 4, 8)
+    assert by_date['All Columns'].tolist() == result['All Columns'].tolist()
+    assert result['All Columns'].str.contains('25JAN').all()
+
+
+def test_month_names_skip_next_year_contracts():
+    data = make_bhav_copy(10_000)
+    result, error = generate_tokens(data, 'FEB', 4, 8)
+    assert error is None and result.attrs['expiry'] == '2025-02-27'
+    assert not result['All Columns'].str.contains('26FEB').any()
+
+
+def test_counts_and_exclusions(data):
+    result, _ = generate_tokens(data, 'NEAR', 4, 8)
+    counts = token_counts(result)
+    assert counts == result['Type'].value_counts().to_dict()
+    assert counts['CE'] == counts['PE']
+    assert not result['All Columns'].str.contains('NIFTY').any()
+
+    excluded, _ = generate_tokens(data, 'NEAR', 4, 8, exclude={'STK0000'})
+    assert not excluded['All Columns'].str.contains('STK0000').any()
+    assert len(excluded) < len(result)
+
+
+def test_run_analysis_through_store(tmp_path, data):
+    store = BhavCopyStore(tmp_path, fetcher=lambda trade_date: data)
+    cache = TokenResultCache()
+    first, error = run_analysis('2025-01-15', 'FEB', 4, 8, store, cache)
+    again, _ = run_analysis('2025-01-15', 'FEB', 4, 8, store, cache)
+    assert error is None and again is first
+    assert cache.stats()['hits'] == 1
+
+
+def test_empty_date_reports_an_error(tmp_path):
+    store = BhavCopyStore(tmp_path, fetcher=lambda trade_date: None)
+    result, error = run_analysis(f"{datetime.date(2025, 1, 26)}", 'NEAR', 4, 8, store, TokenResultCache())
+    assert result is None and error == "No data available for the selected date."
@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+
+from benchmarks.synthetic import make_bhav_copy
+from trading_tools.token_engine import TOKEN_COLUMN, generate_tokens
+from trading_tools.token_export import ExportCache, export_chunks, write_export
+
+
+@pytest.fixture(scope='module')
+def tokens():
+    result, _ = generate_tokens(make_bhav_copy(10_000), 'FEB', 4, 8)
+    return result
+
+
+def one_shot(result_df, fmt):
+    # The export as the dashboards built it before streaming
+    if fmt == 'csv':
+        return result_df[[TOKEN_COLUMN]].to_csv(index=False).encode('utf-8')
+    return "\n".join(result_df[TOKEN_COLUMN].tolist()).encode('utf-8')
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'txt'])
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('chunk_rows', [1, 7, 1000, 1_000_000])
+def test_chunks_join_to_the_one_shot_export(tokens, fmt, descending, chunk_rows):
+    ordered = tokens.iloc[::-1] if descending else tokens
+    expected = one_shot(ordered, fmt)
+    assert b"".join(export_chunks(tokens, fmt, descending=descending, chunk_rows=chunk_rows)) == expected
+
+    compressed = b"".join(export_chunks(tokens, fmt, compress=True, descending=descending, chunk_rows=chunk_rows))
+    assert gzip.decompress(compressed) == expected
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'txt'])
+def test_empty_frame_matches_the_one_shot_export(tokens, fmt):
+    assert b"".join(export_chunks(tokens.iloc[:0], fmt)) == one_shot(tokens.iloc[:0], fmt)
+
+
+def test_written_and_cached_exports_are_the_same_bytes(tmp_path, tokens):
+    path = tmp_path / 'tokens.csv.gz'
+    written = write_export(path, tokens, 'csv', compress=True)
+    cache = ExportCache()
+    data = cache.export_bytes(tokens, 'csv', compress=True)
+    assert path.read_bytes() == data and written == len(data)
+    assert cache.export_bytes(tokens, 'csv', compress=True) is data
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_unknown_format_is_rejected(tokens):
+    with pytest.raises(ValueError, match='Unknown export format'):
+        export_chunks(tokens, 'xlsx')
@@ -0,0 +1,73 @@
+import datetime
+import os
+import time
+
+import pytest
+
+from trading_tools import trading_calendar
+from trading_tools.trading_calendar import CalendarService, TradingCalendar
+
+TODAY = datetime.date.today()
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Calls to ``TradingCalendar.build``, with the default window cut to this year."""
+    monkeypatch.setattr(trading_calendar, 'YEARS_BACK', 0)
+    monkeypatch.setattr(trading_calendar, 'YEARS_AHEAD', 0)
+    calls = []
+    build = TradingCalendar.build
+
+    def counting_build(start, end):
+        calls.append((start, end))
+        return build(start, end)
+
+    monkeypatch.setattr(TradingCalendar, 'build', staticmethod(counting_build))
+    return calls
+
+
+def test_persisted_calendar_is_reused(tmp_path, builds):
+    path = tmp_path / 'sessions.npz'
+    CalendarService(path).is_trading_day(TODAY)
+    CalendarService(path).is_trading_day(TODAY)
+    assert len(builds) == 1
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_rebuilds_after_max_age_days(tmp_path, builds):
+    path = tmp_path / 'sessions.npz'
+    CalendarService(path).is_trading_day(TODAY)
+    stale = time.time() - 8 * 86400
+    os.utime(path, (stale, stale))
+
+    CalendarService(path, max_age_days=30).is_trading_day(TODAY)
+    assert len(builds) == 1
+    CalendarService(path, max_age_days=7).is_trading_day(TODAY)
+    assert len(builds) == 2
+    assert path.stat().st_mtime > stale
+
+
+def test_date_outside_the_window_rebuilds(tmp_path, builds):
+    service = CalendarService(tmp_path / 'sessions.npz')
+    service.is_trading_day(TODAY)
+    assert service.is_trading_day(datetime.date(2015, 3, 2))
+    assert not service.is_trading_day(datetime.date(2015, 3, 7))
+    assert service.next_trading_day(datetime.date(2015, 3, 6)) == datetime.date(2015, 3, 9)
+    assert len(builds) == 2
+    assert builds[-1][0] == datetime.date(2015, 3, 2)
+
+
+def test_range_past_both_ends_rebuilds_once(tmp_path, builds):
+    service = CalendarService(tmp_path / 'sessions.npz')
+    service.is_trading_day(TODAY)
+    start, end = datetime.date(2015, 12, 28), datetime.date(TODAY.year + 1, 1, 8)
+
+    sessions = service.sessions_between(start, end)
+    assert len(builds) == 2
+    assert builds[-1] == (start, end)
+    assert sessions[0] == start
+    assert service.calendar(start, end).covers(TODAY)
+
+    # The wider window is what later services load
+    assert CalendarService(tmp_path / 'sessions.npz').sessions_between(start, end) == sessions
+    assert len(builds) == 2
@@ -0,0 +1 @@
+"""Shared building blocks for the trading dashboards and scripts."""
@@ -0,0 +1,30 @@
+"""Token analysis entry points shared by every dashboard page."""
+import datetime
+
+from trading_tools.bhav_store import default_store
+from trading_tools.result_cache import token_cache
+from trading_tools.trading_calendar import nse_calendar
+
+
+def is_trading_day(date, calendar=None):
+    # Binary search in the NSE session calendar cached for the process
+    return (calendar or nse_calendar).is_trading_day(date)
+
+
+def run_analysis(date_str, expiry, oi_threshold, atm_percentage, store=None, cache=None, exclude=()):
+    """Load the bhav copy for ``date_str`` and return ``(result_df, error)``.
+
+    ``exclude`` lists extra underlyings to leave out of the tokens.
+    ``store`` and ``cache`` default to the process-wide bhav store and token
+    result cache.
+    """
+    try:
+        # Load the derivatives data from the local store, downloading it only on a miss
+        date_obj = datetime.datetime.strptime(date_str, '%Y-%m-%d')
+        data = (store or default_store()).load(date_obj)
+
+        # Apply the expiry, moneyness, ATM band and OI filters, reusing a cached result for the same inputs
+        return (cache or token_cache).tokens(data, expiry, oi_threshold, atm_percentage, exclude)
+
+    except Exception as e:
+        return None, f"Error: {str(e)}"
@@ -0,0 +1,24 @@
+"""Write files so readers never see a partial one."""
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_path(path, suffix='.tmp'):
+    """Temporary path next to ``path`` that replaces it when the block succeeds.
+
+    ``suffix`` is kept for writers that pick a format or append an extension
+    from the file name (``to_excel``, ``np.savez``). On an error the
+    temporary file is removed and ``path`` is left as it was.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=suffix)
+    os.close(fd)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,117 @@
+"""Headless token generation for a range of trade dates and expiries.
+
+Dates are fanned out over a small process pool; each worker loads its bhav
+copy through the shared on-disk store and streams the same CSV/TXT files as the
+dashboard download buttons to disk in chunks, gzipped with ``--gzip``.
+Files are written atomically and dates whose files already exist are
+skipped, so an interrupted back-fill resumes where it stopped.
+
+    python -m trading_tools.batch_tokens --start 2025-01-01 --end 2025-03-31 \\
+        --expiries NEAR NEXT --out tokens [--gzip]
+
+Expiries are NEAR/NEXT/FAR, resolved against each date's bhav copy, month
+names or ISO expiry dates. An expiry that fails on one date is reported as
+an error for that date and the rest of the back-fill carries on.
+"""
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from trading_tools.bhav_store import default_store
+from trading_tools.expiry import LIVE_EXPIRIES
+from trading_tools.instrument_index import MONTHS
+from trading_tools.token_engine import generate_tokens, parse_symbols
+from trading_tools.token_export import write_export
+from trading_tools.trading_calendar import nse_calendar
+
+# Every worker may be downloading from NSE's archive, which throttles or
+# blocks clients that open many connections at once
+DEFAULT_WORKERS = 3
+
+
+def output_paths(out_dir, trade_date, expiry, compress=False):
+    stem = f"stock_crtoken_{trade_date:%Y-%m-%d}_{expiry}"
+    suffix = '.gz' if compress else ''
+    return out_dir / f"{stem}.csv{suffix}", out_dir / f"{stem}.txt{suffix}"
+
+
+def expiry_arg(value):
+    # argparse type for --expiries: NEAR/NEXT/FAR, a month name or an ISO date
+    value = value.upper()
+    if value in LIVE_EXPIRIES or value in MONTHS:
+        return value
+    try:
+        datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"{value!r} is not NEAR/NEXT/FAR, a month name ({'/'.join(MONTHS)}) or a YYYY-MM-DD date") from None
+    return value
+
+
+def process_date(trade_date, expiries, oi_threshold, atm_percentage, out_dir, exclude=(), compress=False):
+    """Generate every pending expiry for one date; returns ``(date, messages)``."""
+    out_dir = Path(out_dir)
+    pending = [e for e in expiries if not all(p.exists() for p in output_paths(out_dir, trade_date, e, compress))]
+    if not pending:
+        return trade_date, ['already done']
+
+    try:
+        data = default_store().load(trade_date)
+    except Exception as e:
+        return trade_date, [f"Error: {str(e)}"]
+
+    messages = []
+    for expiry in pending:
+        try:
+            result_df, error = generate_tokens(data, expiry, oi_threshold, atm_percentage, exclude)
+            if error:
+                messages.append(f"{expiry}: {error}")
+                continue
+            csv_path, txt_path = output_paths(out_dir, trade_date, expiry, compress)
+            write_export(csv_path, result_df, 'csv', compress)
+            write_export(txt_path, result_df, 'txt', compress)
+        except Exception as e:
+            messages.append(f"Error: {expiry}: {str(e)}")
+            continue
+        messages.append(f"{expiry} ({result_df.attrs['expiry']}): {len(result_df)} tokens")
+    return trade_date, messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate stock CR token files for a range of dates.")
+    parser.add_argument('--start', required=True, type=datetime.date.fromisoformat)
+    parser.add_argument('--end', required=True, type=datetime.date.fromisoformat)
+    parser.add_argument('--expiries', '--months', nargs='+', required=True, type=expiry_arg,
+                        help="NEAR NEXT FAR, expiry month names (e.g. JAN FEB) or dates (2025-01-30)")
+    parser.add_argument('--oi-threshold', type=float, default=4)
+    parser.add_argument('--atm-percentage', type=float, default=8)
+    parser.add_argument('--exclude', nargs='*', default=[], help="extra underlyings to leave out, e.g. IDEA YESBANK")
+    parser.add_argument('--out', type=Path, default=Path('tokens'))
+    parser.add_argument('--gzip', action='store_true', help="write .csv.gz/.txt.gz files")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="dates processed at once, each possibly downloading its bhav copy from NSE")
+    args = parser.parse_args(argv)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    expiries = args.expiries
+    exclude = parse_symbols(' '.join(args.exclude))
+    dates = nse_calendar.sessions_between(args.start, args.end)
+    print(f"{len(dates)} trading days between {args.start} and {args.end}")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(process_date, day, expiries, args.oi_threshold, args.atm_percentage, args.out,
+                        exclude, args.gzip)
+            for day in dates
+        ]
+        for future in as_completed(futures):
+            trade_date, messages = future.result()
+            failed += any(message.startswith('Error') for message in messages)
+            print(f"{trade_date}: {'; '.join(messages)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,218 @@
+"""On-disk store of F&O bhav copies, one compressed Parquet file per trade date.
+
+The NSE download is only made on a miss; later loads of the same trade date
+read the local columnar file. Fetchers are plain callables taking a
+``datetime.date`` and returning a DataFrame, so tests and offline runs can
+swap the network fetch for fixture files.
+"""
+import datetime
+import hashlib
+import os
+import time
+import weakref
+from pathlib import Path
+
+import pandas as pd
+
+from trading_tools.atomic_write import atomic_path
+from trading_tools.lru import BoundedLRU
+
+DEFAULT_STORE_DIR = Path.home() / '.cache' / 'trading_tools' / 'bhav'
+
+# Columns stored with a fixed dtype; anything else is kept as read
+CATEGORY_COLUMNS = ('TradDt', 'BizDt', 'Sgmt', 'Src', 'FinInstrmTp', 'TckrSymb', 'SctySrs',
+                    'XpryDt', 'FininstrmActlXpryDt', 'OptnTp', 'SsnId')
+FLOAT_COLUMNS = ('StrkPric', 'OpnPric', 'HghPric', 'LwPric', 'ClsPric', 'LastPric',
+                 'PrvsClsgPric', 'UndrlygPric', 'SttlmPric', 'TtlTrfVal')
+INT_COLUMNS = ('OpnIntrst', 'ChngInOpnIntrst', 'TtlTradgVol', 'TtlNbOfTxsExctd', 'NewBrdLotQty')
+
+# id(frame) -> (weak reference to the frame, digest), see frame_digest
+_digests = {}
+
+
+def nselib_fetcher(trade_date):
+    # Imported here so reading a stored copy never pays for nselib
+    from nselib import derivatives
+    return derivatives.fno_bhav_copy(trade_date.strftime('%d-%m-%Y'))
+
+
+def directory_fetcher(directory):
+    """Fetcher reading NSE-named bhav copy CSVs (optionally zipped) from a directory."""
+    directory = Path(directory)
+
+    def fetch(trade_date):
+        stem = f"BhavCopy_NSE_FO_0_0_0_{trade_date:%Y%m%d}_F_0000.csv"
+        for name in (stem, stem + '.zip'):
+            path = directory / name
+            if path.exists():
+                return pd.read_csv(path)
+        return pd.DataFrame()
+
+    return fetch
+
+
+def frame_digest(data):
+    """Content hash of a bhav copy, memoized per frame object.
+
+    The memo is keyed on the frame itself through a weak reference, so a
+    filtered or sliced frame hashes its own rows and an entry goes away
+    with its frame. Frames are hashed as they are; one changed in place
+    after hashing keeps its old digest, which is why the store's frames
+    are read-only. The store hashes a copy once when it is first written
+    and keeps the digest in the Parquet file for later loads.
+    """
+    entry = _digests.get(id(data))
+    if entry is not None and entry[0]() is data:
+        return entry[1]
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+    _remember_digest(data, digest)
+    return digest
+
+
+def _remember_digest(data, digest):
+    key = id(data)
+
+    def forget(ref):
+        # Only drop the entry if a newer frame has not taken over the id
+        if _digests.get(key, (None,))[0] is ref:
+            del _digests[key]
+
+    _digests[key] = (weakref.ref(data, forget), digest)
+
+
+def normalize_dtypes(data):
+    data = data.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype('category')
+    for col in FLOAT_COLUMNS:
+        if col in data.columns:
+            data[col] = pd.to_numeric(data[col], errors='coerce').astype('float64')
+    for col in INT_COLUMNS:
+        if col in data.columns:
+            values = pd.to_numeric(data[col], errors='coerce')
+            data[col] = values.astype('int64') if values.notna().all() else values.astype('Int64')
+    return data
+
+
+class BhavCopyStore:
+    """Persist each trade date's bhav copy once and serve later loads from disk.
+
+    ``max_bytes`` and ``max_age_days`` bound the store; the least recently
+    used files are evicted first. ``None`` disables the respective limit.
+    The last ``memory_items`` frames are also kept in process so Streamlit
+    reruns skip the Parquet read. Callers must treat returned frames as
+    read-only.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, fetcher=nselib_fetcher, max_bytes=None,
+                 max_age_days=None, compression='zstd', memory_items=2):
+        self.root = Path(root)
+        self.fetcher = fetcher
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.compression = compression
+        self.memory_items = memory_items
+        self._memory = BoundedLRU(memory_items)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, trade_date):
+        return self.root / f"fo_bhav_{trade_date:%Y%m%d}.parquet"
+
+    def __contains__(self, trade_date):
+        return self.path_for(_as_date(trade_date)).exists()
+
+    def load(self, trade_date):
+        """Return the bhav copy for ``trade_date``, fetching it only on a miss."""
+        trade_date = _as_date(trade_date)
+        data = self._memory.get(trade_date)
+        if data is not None:
+            return data
+
+        path = self.path_for(trade_date)
+        if path.exists():
+            # Touch the file so eviction treats it as recently used
+            os.utime(path)
+            data = pd.read_parquet(path)
+            # The file holds exactly the rows hashed before it was written
+            digest = data.attrs.pop('content_hash', None)
+            if isinstance(digest, str):
+                _remember_digest(data, digest)
+        else:
+            data = self.fetcher(trade_date)
+            # Empty downloads (holidays, copy not published yet) are not cached
+            if data is None or data.empty:
+                return pd.DataFrame() if data is None else data
+
+            data = normalize_dtypes(data)
+            self._write(path, data)
+            self.evict()
+
+        self._remember(trade_date, data)
+        return data
+
+    def _remember(self, trade_date, data):
+        if self.memory_items:
+            self._memory.put(trade_date, data)
+
+    def _write(self, path, data):
+        # The digest travels in the file's metadata; the caller's frame keeps no attrs
+        out = data.copy(deep=False)
+        out.attrs = {'content_hash': frame_digest(data)}
+        with atomic_path(path) as tmp:
+            out.to_parquet(tmp, compression=self.compression, index=False)
+
+    def evict(self):
+        """Drop files older than ``max_age_days`` then trim to ``max_bytes``."""
+        entries = []
+        for path in self.root.glob('fo_bhav_*.parquet'):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            expired = [entry for entry in entries if entry[0] < cutoff]
+            for _, _, path in expired:
+                path.unlink(missing_ok=True)
+            entries = entries[len(expired):]
+
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self):
+        self._memory.clear()
+        for path in self.root.glob('fo_bhav_*.parquet'):
+            path.unlink(missing_ok=True)
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    return value
+
+
+_default_store = None
+
+
+def default_store():
+    """Process-wide store configured from ``BHAV_STORE_DIR``, ``BHAV_STORE_MAX_MB``
+    and ``BHAV_STORE_MAX_AGE_DAYS``."""
+    global _default_store
+    if _default_store is None:
+        max_mb = os.environ.get('BHAV_STORE_MAX_MB')
+        max_age = os.environ.get('BHAV_STORE_MAX_AGE_DAYS')
+        _default_store = BhavCopyStore(
+            root=os.environ.get('BHAV_STORE_DIR', DEFAULT_STORE_DIR),
+            max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else None,
+            max_age_days=float(max_age) if max_age else None,
+        )
+    return _default_store
@@ -0,0 +1,82 @@
+"""Expiry resolution from the expiry dates listed in a bhav copy.
+
+Replaces matching a month name anywhere in ``FinInstrmNm``: a selection such
+as ``'NEAR'`` or ``'FEB'`` is resolved to one exact expiry date, so contracts
+of the same month next year (or symbols that merely contain a month name)
+are never picked up.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from trading_tools.instrument_index import MONTHS
+
+LIVE_EXPIRIES = ('NEAR', 'NEXT', 'FAR')
+
+
+class ExpiryResolver:
+    """Live and monthly expiries per underlying for one instrument index.
+
+    The monthly expiry of an underlying is its last expiry in a calendar
+    month; weekly index expiries are therefore never picked as monthly.
+    """
+
+    def __init__(self, index):
+        frame = index.frame[['underlying', 'expiry']].drop_duplicates()
+        frame = frame[frame['expiry'].notna()].sort_values(['underlying', 'expiry'])
+        self.expiries = frame.reset_index(drop=True)
+
+        months = self.expiries['expiry'].dt.to_period('M')
+        monthly = self.expiries.groupby([self.expiries['underlying'], months], observed=True)['expiry'].max()
+        self.monthly = monthly.reset_index(level=1, drop=True).reset_index()
+
+        # Dates shared by the tradable underlyings drive the token pipeline
+        tradable = ~index.excluded_underlyings[self.monthly['underlying'].cat.codes.to_numpy()]
+        dates = self.monthly['expiry'][tradable] if tradable.any() else self.monthly['expiry']
+        self.monthly_dates = np.unique(dates.to_numpy().astype('datetime64[D]'))
+
+    def live(self, underlying):
+        """Near, next and far monthly expiries of one underlying."""
+        dates = self.monthly.loc[self.monthly['underlying'] == underlying, 'expiry']
+        dates = [d.date() for d in dates]
+        return dict(zip(LIVE_EXPIRIES, dates))
+
+    def table(self):
+        """One row per underlying with its near/next/far monthly expiries."""
+        ranked = self.monthly.assign(rank=self.monthly.groupby('underlying', observed=True).cumcount())
+        ranked = ranked[ranked['rank'] < len(LIVE_EXPIRIES)]
+        table = ranked.pivot(index='underlying', columns='rank', values='expiry')
+        table.columns = [LIVE_EXPIRIES[i].lower() for i in table.columns]
+        return table.reset_index()
+
+    def monthly_expiries(self):
+        return self.monthly_dates.astype(datetime.date).tolist()
+
+    def resolve(self, selection):
+        """Exact expiry for ``'NEAR'``/``'NEXT'``/``'FAR'``, a month name or a date.
+
+        Returns ``None`` when the bhav copy has no matching monthly expiry.
+        """
+        dates = self.monthly_dates
+        if isinstance(selection, str):
+            selection = selection.upper()
+            if selection in LIVE_EXPIRIES:
+                i = LIVE_EXPIRIES.index(selection)
+                return dates[i].astype(datetime.date) if i < len(dates) else None
+            if selection in MONTHS:
+                # The first live monthly expiry falling in that month
+                months = dates.astype('datetime64[M]').astype(int) % 12
+                matches = dates[months == MONTHS.index(selection)]
+                return matches[0].astype(datetime.date) if len(matches) else None
+            selection = datetime.date.fromisoformat(selection)
+        return pd.Timestamp(selection).date()
+
+
+def expiry_label(expiry):
+    # Display expiries the way NSE prints them, e.g. 30-JAN-2025
+    if expiry is None:
+        return ''
+    if isinstance(expiry, str):
+        expiry = datetime.date.fromisoformat(expiry)
+    return expiry.strftime('%d-%b-%Y').upper()
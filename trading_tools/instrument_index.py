@@ -0,0 +1,176 @@
+"""Parsed, sorted index of the instruments in one bhav copy.
+
+Each instrument's underlying, expiry, strike, option type and kind are read
+once, from the UDiFF ``TckrSymb``/``XpryDt``/``StrkPric``/``OptnTp`` columns
+where the copy has them and otherwise by parsing ``FinInstrmNm``. Expiry selection, CE/PE pairing and symbol
+exclusions then become dictionary lookups and array indexing instead of a
+regex scan over the name column on every run.
+"""
+import numpy as np
+import pandas as pd
+
+from trading_tools.bhav_store import frame_digest
+from trading_tools.lru import BoundedLRU
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+# e.g. RELIANCE25JAN1300CE, IDEA25JAN7.5PE, RELIANCE25JANFUT
+NAME_PATTERN = (
+    r'^(?P<underlying>.+?)(?P<year>\d{2})(?P<month>' + '|'.join(MONTHS) + r')'
+    r'(?:(?P<strike>\d+(?:\.\d+)?)(?P<option_type>CE|PE)|(?P<fut>FUT))$'
+)
+
+# UDiFF columns that carry the name's parts already split out
+STRUCTURED_COLUMNS = ('TckrSymb', 'XpryDt', 'StrkPric', 'OptnTp')
+
+# Underlyings whose tokens are never generated: index products and symbols with a dot
+EXCLUDED_SUBSTRINGS = ('NIFTY', '.')
+
+
+class InstrumentIndex:
+    """Instrument table of a bhav copy sorted by (underlying, expiry, strike).
+
+    ``frame`` holds the parsed columns; the NumPy arrays exposed as attributes
+    serve the hot paths, with the instrument names and their CE/PE stems kept
+    only as arrays. Rows that are neither a future nor a
+    CE/PE option with an expiry are not indexed.
+    """
+
+    def __init__(self, data):
+        if all(col in data.columns for col in STRUCTURED_COLUMNS):
+            parsed, fields = _structured_fields(data)
+        else:
+            parsed, fields = _name_fields(data)
+        data = data[parsed]
+        is_fut = fields['is_fut']
+        strike = fields['strike']
+        underlying = pd.Categorical(fields['underlying'])
+
+        # Sorted on the NumPy arrays; categories are sorted, so codes order like the symbols
+        order = np.lexsort((strike, fields['expiry'], underlying.codes))
+        is_fut, strike = is_fut[order], strike[order]
+        names = data['FinInstrmNm'].astype(str)
+        self.name = names.to_numpy(dtype=object)[order]
+        # Name without the CE/PE suffix, shared by both legs of a strike
+        self.stem = np.where(is_fut, self.name, names.str[:-2].to_numpy(dtype=object)[order])
+
+        frame = pd.DataFrame({
+            'underlying': underlying[order],
+            'expiry': fields['expiry'][order],
+            'strike': strike,
+            'option_type': pd.Categorical(fields['option_type'][order], categories=['CE', 'PE']),
+            'kind': pd.Categorical(np.where(is_fut, 'FUT', 'OPT'), categories=['FUT', 'OPT']),
+            'underlying_price': data['UndrlygPric'].to_numpy(dtype=float)[order],
+            'oi_lots': (data['OpnIntrst'].to_numpy(dtype=float) / data['NewBrdLotQty'].to_numpy(dtype=float))[order],
+            # Fractional strikes are excluded along with the excluded underlyings
+            'fractional': np.isfinite(strike) & (strike != np.floor(strike)),
+        })
+        self.frame = frame
+
+        self.underlying_codes = frame['underlying'].cat.codes.to_numpy()
+        self.excluded_underlyings = np.array(
+            [any(text in symbol for text in EXCLUDED_SUBSTRINGS) for symbol in underlying.categories],
+            dtype=bool,
+        )
+
+        self.is_fut = is_fut
+        self.option_type = frame['option_type'].to_numpy(dtype=object)
+        self.strike = strike
+        self.underlying_price = frame['underlying_price'].to_numpy()
+        self.oi_lots = frame['oi_lots'].to_numpy()
+        self.excluded = self.excluded_underlyings[self.underlying_codes] | frame['fractional'].to_numpy()
+
+        # Row positions grouped by exact expiry, for O(1) expiry selection
+        expiry_days = frame['expiry'].to_numpy().astype('datetime64[D]')
+        order = np.argsort(expiry_days, kind='stable')
+        days, starts = np.unique(expiry_days[order], return_index=True)
+        bounds = np.append(starts, len(order))
+        self._expiry_rows = {
+            day: order[bounds[i]:bounds[i + 1]] for i, day in enumerate(days)
+        }
+        self._resolver = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def expiries(self):
+        """``ExpiryResolver`` for this bhav copy, built on first use."""
+        if self._resolver is None:
+            from trading_tools.expiry import ExpiryResolver
+            self._resolver = ExpiryResolver(self)
+        return self._resolver
+
+    def excluded_rows(self, exclude=()):
+        """Row mask of ``excluded`` plus every row whose underlying is in ``exclude``.
+
+        ``exclude`` is a collection of exact underlying symbols; membership is
+        checked once per distinct underlying, not per row.
+        """
+        if not exclude:
+            return self.excluded
+        listed = self.frame['underlying'].cat.categories.isin(list(exclude))
+        return self.excluded | listed[self.underlying_codes]
+
+    def rows_for_expiry(self, expiry):
+        """Sorted row positions of every instrument expiring on ``expiry``."""
+        if expiry is None:
+            return np.empty(0, dtype=np.intp)
+        return self._expiry_rows.get(np.datetime64(expiry, 'D'), np.empty(0, dtype=np.intp))
+
+
+def _structured_fields(data):
+    """Instrument fields from the UDiFF columns, without parsing the names."""
+    option_type = data['OptnTp'].astype(object)
+    is_option = option_type.isin(['CE', 'PE']).to_numpy()
+    if 'FinInstrmTp' in data.columns:
+        is_fut = data['FinInstrmTp'].isin(['STF', 'IDF']).to_numpy()
+    else:
+        is_fut = data['FinInstrmNm'].astype(str).str.endswith('FUT').to_numpy()
+    expiry = pd.to_datetime(data['XpryDt'].astype(object), errors='coerce').to_numpy()
+    underlying = data['TckrSymb'].astype(object)
+    parsed = (is_option | is_fut) & underlying.notna().to_numpy() & ~np.isnat(expiry)
+
+    strike = pd.to_numeric(data['StrkPric'], errors='coerce').to_numpy(dtype=float)
+    return parsed, {
+        'underlying': underlying.to_numpy()[parsed],
+        'expiry': expiry[parsed],
+        'strike': np.where(is_fut, np.nan, strike)[parsed],
+        'option_type': option_type.to_numpy()[parsed],
+        'is_fut': is_fut[parsed],
+    }
+
+
+def _name_fields(data):
+    """Instrument fields parsed out of ``FinInstrmNm``, for copies without the UDiFF columns."""
+    parts = data['FinInstrmNm'].astype(str).str.extract(NAME_PATTERN)
+    parsed = parts['underlying'].notna().to_numpy()
+    parts = parts[parsed]
+
+    if 'XpryDt' in data.columns:
+        expiry = pd.to_datetime(data['XpryDt'][parsed].astype(str), errors='coerce').to_numpy()
+    else:
+        month = parts['month'].map({name: i + 1 for i, name in enumerate(MONTHS)}).to_numpy(dtype=np.int8)
+        year = 2000 + parts['year'].to_numpy(dtype=np.int16)
+        expiry = pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': 1})).to_numpy()
+    return parsed, {
+        'underlying': parts['underlying'].to_numpy(dtype=object),
+        'expiry': expiry,
+        'strike': pd.to_numeric(parts['strike']).to_numpy(dtype=float),
+        'option_type': parts['option_type'].to_numpy(dtype=object),
+        'is_fut': parts['fut'].notna().to_numpy(),
+    }
+
+
+MAX_INDEXES = 4
+_indexes = BoundedLRU(MAX_INDEXES)
+
+
+def instrument_index(data):
+    """Return the index for ``data``, building it once per bhav copy content."""
+    key = frame_digest(data)
+    index = _indexes.get(key)
+    if index is None:
+        index = InstrumentIndex(data)
+        _indexes.put(key, index)
+    return index
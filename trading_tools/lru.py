@@ -0,0 +1,70 @@
+"""Thread-safe LRU map bounded by entry count and, optionally, total bytes.
+
+The in-process caches of trading_tools (token results, exports, parsed POS
+uploads, instrument indexes) are module-level instances of this class, so
+they survive Streamlit reruns and one cache serves every session.
+"""
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class BoundedLRU:
+    """Least recently used entries are evicted once ``maxsize`` entries or
+    ``max_bytes`` (as measured by ``sizeof``) are exceeded.
+
+    ``max_bytes=None`` bounds the entry count only. ``get`` counts hits and
+    misses for ``stats``.
+    """
+
+    def __init__(self, maxsize, max_bytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """Store ``value``; one larger than the whole byte budget is not kept."""
+        nbytes = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                return
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            while len(self._entries) > self.maxsize or (
+                    self.max_bytes is not None and self._nbytes > self.max_bytes):
+                self._nbytes -= self._entries.popitem(last=False)[1][1]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            stats = {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+            if self.max_bytes is not None:
+                stats.update(nbytes=self._nbytes, max_bytes=self.max_bytes)
+            return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,68 @@
+"""M2M bar chart that stays small however many symbols the book holds.
+
+The FX legs are summed per symbol on the server. Up to ``MAX_BARS`` symbols
+are drawn one bar each; above that the chart keeps the ``top`` highest and
+``bottom`` lowest M2M symbols and folds the rest into one "Others" bar, so
+the figure sent to the browser has a fixed size. When every symbol is asked
+for and there are more than ``WEBGL_ROWS`` of them, the points are drawn
+with WebGL markers instead of SVG bars.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from trading_tools.pos import M2M_COLUMN, QTY_COLUMN, SYMBOL_COLUMN, TYPE_COLUMN
+
+OTHERS_LABEL = 'Others'
+MAX_BARS = int(os.environ.get('M2M_CHART_MAX_BARS', '100'))
+WEBGL_ROWS = int(os.environ.get('M2M_CHART_WEBGL_ROWS', '1000'))
+
+
+def symbol_m2m(positions):
+    """M2M of the open FX legs summed per symbol, smallest first."""
+    fx = positions[(positions[TYPE_COLUMN] == 'FX') & (positions[QTY_COLUMN] != 0)]
+    m2m = fx.groupby(SYMBOL_COLUMN, observed=True)[M2M_COLUMN].sum()
+    m2m.index = m2m.index.astype(str)
+    return m2m.sort_values(kind='stable')
+
+
+def bucket_m2m(m2m, top=MAX_BARS // 2, bottom=MAX_BARS // 2):
+    """Keep the ``bottom`` lowest and ``top`` highest of a sorted ``symbol_m2m``.
+
+    The symbols in between are summed into one ``'Others (n)'`` entry placed
+    between the two ends. Short series come back unchanged.
+    """
+    if len(m2m) <= top + bottom + 1:
+        return m2m
+    middle = m2m.iloc[bottom:len(m2m) - top]
+    others = pd.Series([middle.sum()], index=[f"{OTHERS_LABEL} ({len(middle)})"])
+    return pd.concat([m2m.iloc[:bottom], others, m2m.iloc[len(m2m) - top:]])
+
+
+def m2m_figure(m2m, title="M2M", top=MAX_BARS // 2, bottom=MAX_BARS // 2, webgl_rows=WEBGL_ROWS):
+    """Plotly figure of a per-symbol M2M series.
+
+    A series longer than ``top + bottom + 1`` is bucketed with
+    ``bucket_m2m`` first; ``top=None`` draws every symbol. Only the bucketing
+    bounds the payload: the values are sent as a binary array, but the
+    symbol labels are not, so a chart of every symbol is about as large as
+    one bar per FX row.
+    """
+    # Plotly is only imported when there is a chart to draw, keeping it off the cold start path
+    import plotly.graph_objects as go
+
+    if top is not None:
+        m2m = bucket_m2m(m2m, top=top, bottom=bottom)
+    symbols = m2m.index.tolist()
+    values = m2m.to_numpy(dtype=np.float64)
+    if len(m2m) > webgl_rows:
+        trace = go.Scattergl(x=symbols, y=values, mode='markers', marker={'size': 4})
+    else:
+        trace = go.Bar(x=symbols, y=values)
+    fig = go.Figure(trace)
+    fig.update_layout(title=title, xaxis_title='Stocks', yaxis_title='M2M', xaxis_tickangle=-90)
+    if len(m2m) > webgl_rows:
+        # Thousands of tick labels cannot be read; hover still names the symbol
+        fig.update_xaxes(showticklabels=False)
+    return fig
@@ -0,0 +1,166 @@
+"""Persistent SQLite cache of per-stock margins.
+
+Entries are keyed on (trade date, source, symbol, expiry, strike, legs), so
+a rerun on the same day serves unchanged stocks from disk and only the new
+or changed ones are scraped or computed. Margins are only valid for the
+day they were taken and for the risk parameters they came from:
+
+- a lookup only sees entries of its own trade date, and ``purge`` drops
+  older days and contracts already expired;
+- each entry stores the digest of the risk-parameter files in force when
+  it was taken (empty when none was given); entries of another digest are
+  neither served nor kept once new ones are stored, so an intraday SPAN
+  file update invalidates the day's margins.
+"""
+import datetime
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'trading_tools' / 'margins.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS margins (
+    trade_date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    expiry TEXT NOT NULL,
+    strike REAL NOT NULL,
+    legs TEXT NOT NULL,
+    params TEXT NOT NULL,
+    margin REAL NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (trade_date, source, symbol, expiry, strike, legs)
+)
+"""
+
+
+def file_digest(*paths):
+    """Content hash of the given files, in order; ``None`` paths are skipped."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        if path is not None:
+            with open(path, 'rb') as handle:
+                for block in iter(lambda: handle.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def expiry_key(expiry):
+    # '27-MAR-2025', '2025-03-27' or a date -> '2025-03-27'; None if unrecognised
+    if isinstance(expiry, (datetime.date, datetime.datetime)):
+        return f"{expiry:%Y-%m-%d}"
+    text = str(expiry).strip()
+    for fmt in ('%Y-%m-%d', '%d-%b-%Y'):
+        try:
+            return datetime.datetime.strptime(text, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def entry_key(symbol, expiry, strike):
+    # (symbol, expiry, strike) as stored, or None for a row that cannot be
+    # keyed (unknown expiry format, missing or non-numeric strike)
+    expiry = expiry_key(expiry)
+    try:
+        strike = float(strike)
+    except (TypeError, ValueError):
+        return None
+    if expiry is None or not math.isfinite(strike):
+        return None
+    return str(symbol), expiry, strike
+
+
+def legs_key(legs):
+    # (('FUT', -1), ('PE', -1), ('CE', 1)) -> 'FUT-1,PE-1,CE+1'
+    return ','.join(f"{kind}{lots:+g}" for kind, lots in legs)
+
+
+class MarginCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call, committed on success
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def lookup(self, keys, trade_date, legs, source, params=''):
+        """Cached margin (or ``None``) for each ``(symbol, expiry, strike)`` key.
+
+        A key that cannot be stored (see ``store``) is a miss.
+        """
+        with self._lock, self._connect() as connection:
+            stored = {(symbol, expiry, strike): margin for symbol, expiry, strike, margin in connection.execute(
+                'SELECT symbol, expiry, strike, margin FROM margins '
+                'WHERE trade_date = ? AND source = ? AND legs = ? AND params = ?',
+                (f"{trade_date:%Y-%m-%d}", source, legs_key(legs), params))}
+        margins = [stored.get(entry_key(*key)) for key in keys]
+        with self._lock:
+            found = sum(margin is not None for margin in margins)
+            self.hits += found
+            self.misses += len(margins) - found
+        return margins
+
+    def store(self, rows, trade_date, legs, source, params=''):
+        """Save ``(symbol, expiry, strike, margin)`` rows; ``None`` margins are skipped.
+
+        So are rows whose expiry is in an unknown format or whose strike is
+        missing or not a number. Entries of the same day and source computed
+        from other parameters are removed.
+        """
+        day, legs = f"{trade_date:%Y-%m-%d}", legs_key(legs)
+        now = datetime.datetime.now().timestamp()
+        keyed = [(entry_key(symbol, expiry, strike), margin) for symbol, expiry, strike, margin in rows
+                 if margin is not None]
+        records = [(day, source, *key, legs, params, float(margin), now) for key, margin in keyed if key is not None]
+        with self._lock, self._connect() as connection:
+            connection.execute('DELETE FROM margins WHERE trade_date = ? AND source = ? AND params != ?',
+                               (day, source, params))
+            connection.executemany('INSERT OR REPLACE INTO margins VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', records)
+        return len(records)
+
+    def purge(self, trade_date):
+        """Drop entries of earlier trade dates and of contracts expired by ``trade_date``."""
+        day = f"{trade_date:%Y-%m-%d}"
+        with self._lock, self._connect() as connection:
+            return connection.execute('DELETE FROM margins WHERE trade_date < ? OR expiry < ?', (day, day)).rowcount
+
+    def stats(self):
+        with self._lock, self._connect() as connection:
+            size = connection.execute('SELECT COUNT(*) FROM margins').fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'size': size}
+
+    def clear(self):
+        with self._lock, self._connect() as connection:
+            connection.execute('DELETE FROM margins')
+            self.hits = 0
+            self.misses = 0
+
+
+_default_cache = None
+
+
+def default_margin_cache():
+    """Process-wide cache at ``MARGIN_CACHE_PATH`` (default under ~/.cache)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MarginCache(os.environ.get('MARGIN_CACHE_PATH', DEFAULT_CACHE_PATH))
+    return _default_cache
@@ -0,0 +1,70 @@
+"""Append-only journal of completed margin rows, for resuming a batch.
+
+Every stock the runner finishes is appended as one JSON line and flushed to
+disk straight away, so a crash, a timeout or a dead browser part way through
+a sheet loses at most the rows in flight. Rerunning the same batch reads the
+journal back and only the stocks without a margin are scraped again.
+
+Entries are tied to the trade date they were taken on; a journal left over
+from an earlier day is ignored. A line cut short by a crash is skipped.
+"""
+import datetime
+import json
+import os
+from pathlib import Path
+
+
+def journal_key(stock, expiry, strike):
+    return str(stock), str(expiry), float(strike)
+
+
+class MarginJournal:
+    def __init__(self, path, trade_date=None):
+        self.path = Path(path)
+        self.trade_date = f"{trade_date or datetime.date.today():%Y-%m-%d}"
+
+    def completed(self):
+        """``{(stock, expiry, strike): entry}`` of today's rows that got a margin.
+
+        Later lines win, so a stock that failed and was retried counts once.
+        """
+        entries = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial last line of an interrupted run
+                    continue
+                if entry.get('trade_date') != self.trade_date:
+                    continue
+                key = journal_key(entry['stock'], entry['expiry'], entry['strike'])
+                if entry.get('margin') is None:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = entry
+        return entries
+
+    def append(self, stock, expiry, strike, margin, error=None, seconds=0.0, steps=None):
+        """Record one finished row and sync it to disk before returning."""
+        entry = {'trade_date': self.trade_date, 'stock': str(stock), 'expiry': str(expiry),
+                 'strike': float(strike), 'margin': margin, 'error': error, 'seconds': seconds,
+                 'steps': steps or {}}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(entry) + '\n').encode('utf-8')
+        with open(self.path, 'a+b') as handle:
+            # Start on a fresh line after a partial one left by a crash
+            if handle.tell():
+                handle.seek(-1, os.SEEK_END)
+                if handle.read(1) != b'\n':
+                    line = b'\n' + line
+            handle.write(line)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def remove(self):
+        """Delete the journal once its batch has been written out."""
+        if self.path.exists():
+            self.path.unlink()
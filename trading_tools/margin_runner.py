@@ -0,0 +1,391 @@
+"""Concurrent SPAN margin lookups through the Zerodha margin calculator.
+
+Each stock's margin is its short future, short ATM put and long ATM call
+entered into the calculator form. Stocks are spread over a pool of isolated
+browser contexts; an ``asyncio.Semaphore`` bounds how many run at once and a
+per-host rate limit spaces out the calculator's requests, both page loads
+and the margin API call behind every Add. Results come back
+in input order, with the error message of any stock that failed instead of
+aborting the run.
+
+There are no fixed pauses: every Add waits for the calculator's margin API
+response to finish and then briefly for the total it renders. A future or
+put leg that leaves the total where it was (a hedge, or the same figure
+rendered again) is not an error. The call leg's total is the stock's
+margin, though, so if it does not change within ``RENDER_TIMEOUT_MS`` the
+stock fails instead of reporting the put leg's total. Each result
+carries the time spent in every step of the form, summarised by
+``step_summary``.
+
+The runner has never been run against a real browser: no Chromium could be
+installed where it was written, so the selectors, the API pattern and the
+render waits are only checked against stub pages, and the local stand-in
+in ``benchmarks.margin_standin`` has not been driven end to end.
+
+With a ``MarginCache``, stocks already priced on the same trade date (and
+against the same risk-parameter file, when one is given) are served from
+disk and only the rest go to the browser. With a ``MarginJournal`` every
+finished row is checkpointed as it completes, so an interrupted batch
+resumes where it stopped; the workbook itself is written once, at the end.
+
+    python -m trading_tools.margin_runner atm.xlsx --expiry 27-MAR-2025 \\
+        --concurrency 4 --rate 2 --out atm_with_margins.xlsx
+"""
+import argparse
+import asyncio
+import datetime
+import re
+import time
+from collections import namedtuple
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from trading_tools.atomic_write import atomic_path
+from trading_tools.margin_cache import default_margin_cache, file_digest
+from trading_tools.margin_journal import MarginJournal, journal_key
+from trading_tools.span_margin import STRATEGY
+
+CALCULATOR_URL = 'https://zerodha.com/margin-calculator/SPAN/'
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/119.0.0.0 Safari/537.36')
+TOTAL_SELECTOR = 'span.val.total'
+# POSTs the calculator makes to price the legs; page loads are GETs
+MARGIN_API_PATTERN = re.compile(r'margin', re.IGNORECASE)
+# Longest wait for one step
+STEP_TIMEOUT_MS = 15_000
+# How long a finished response may take to show in the total; the future and
+# put legs may leave it where it was, the call leg may not
+RENDER_TIMEOUT_MS = 1_000
+STEPS = ['rate_limit', 'load', 'scrip', 'future', 'put', 'call', 'total']
+
+STOCK_COLUMN = 'stocks'
+STRIKE_COLUMN = 'atm'
+MARGIN_COLUMN = 'Margin'
+ERROR_COLUMN = 'Error'
+
+MarginRequest = namedtuple('MarginRequest', ['stock', 'strike', 'expiry'])
+MarginResult = namedtuple('MarginResult', ['stock', 'strike', 'margin', 'error', 'seconds', 'steps'])
+
+
+def parse_margin(text):
+    # "Rs. 1,23,456.50" -> 123456.5
+    match = re.search(r'\d[\d,]*(?:\.\d+)?', text or '')
+    if not match:
+        raise ValueError(f"No margin value in {text!r}")
+    return float(match.group().replace(',', ''))
+
+
+def load_requests(path, expiry):
+    """``MarginRequest`` per row of an atm.xlsx-style sheet (stocks, atm)."""
+    sheet = pd.read_excel(path) if str(path).lower().endswith(('.xlsx', '.xls')) else pd.read_csv(path)
+    return sheet, [MarginRequest(stock, strike, expiry)
+                   for stock, strike in zip(sheet[STOCK_COLUMN], sheet[STRIKE_COLUMN])]
+
+
+class HostRateLimiter:
+    """Spaces out calls per host to at most ``rate`` per second.
+
+    Start times are handed out in arrival order; ``rate=None`` disables the
+    limit. Only used from one event loop, so no lock is needed.
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self._next = {}
+
+    async def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next.get(host, now))
+        self._next[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class StepTimer:
+    """Seconds spent in each named step, measured from the previous mark."""
+
+    def __init__(self):
+        self.steps = {}
+        self._last = time.perf_counter()
+
+    def mark(self, step):
+        now = time.perf_counter()
+        self.steps[step] = now - self._last
+        self._last = now
+
+
+async def add_leg(page, api_pattern, render_timeout=RENDER_TIMEOUT_MS, limiter=None):
+    """Click Add and wait for the pricing call and the total it renders.
+
+    The click posts to the margin API, so it waits its turn with ``limiter``
+    first. Returns whether the total's text changed within ``render_timeout``.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    before = await page.inner_text(TOTAL_SELECTOR)
+    if limiter is not None:
+        await limiter.wait(page.url)
+    async with page.expect_response(
+            lambda response: response.request.method == 'POST' and api_pattern.search(response.url),
+            timeout=STEP_TIMEOUT_MS) as response_info:
+        await page.click('input[type="submit"][value="Add"]')
+    # expect_response resolves on the headers; the page renders from the body
+    response = await response_info.value
+    await response.finished()
+    try:
+        await page.wait_for_function(
+            "([selector, before]) => document.querySelector(selector).innerText !== before",
+            arg=[TOTAL_SELECTOR, before], timeout=render_timeout)
+    except PlaywrightTimeoutError:
+        return False
+    return True
+
+
+async def calculate_margin(page, url, request, timer=None, api_pattern=MARGIN_API_PATTERN, limiter=None):
+    """Enter one stock's three legs on a fresh calculator page; returns the total.
+
+    ``limiter`` paces each Add's API call; the page load is paced by the caller.
+    Raises ``TimeoutError`` when the total does not change after the call leg.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    timer = timer or StepTimer()
+    # The form is usable once the document is parsed; no need to wait for network idle
+    await page.goto(url, wait_until='domcontentloaded')
+    timer.mark('load')
+
+    # Pick the future of the stock for the requested expiry
+    scrip = f"{request.stock} {request.expiry}"
+    await page.click('span#select2-scrip-container')
+    await page.wait_for_selector('ul.select2-results__options')
+    search = await page.query_selector('.select2-search__field')
+    if search:
+        await search.fill(scrip)
+    option = f'li.select2-results__option:has-text("{scrip}")'
+    try:
+        # The results may be filled in after the search is typed
+        await page.wait_for_selector(option, timeout=STEP_TIMEOUT_MS)
+    except PlaywrightTimeoutError:
+        raise LookupError(f"{scrip} not found in the calculator") from None
+    await page.click(option)
+    timer.mark('scrip')
+
+    # Short future; the API response is awaited, an unchanged total is accepted
+    await page.click('input[type="radio"][value="sell"]')
+    await add_leg(page, api_pattern, limiter=limiter)
+    timer.mark('future')
+
+    await page.select_option('select#product', value='OPT')
+    await page.select_option('select#option_type', value='PE')
+    await page.fill('input#strike_price', str(request.strike))
+    await add_leg(page, api_pattern, limiter=limiter)
+    timer.mark('put')
+
+    # Long ATM call; the total it renders is the margin, so it has to change
+    await page.select_option('select#option_type', value='CE')
+    await page.click('input[type="radio"][value="buy"]')
+    if not await add_leg(page, api_pattern, limiter=limiter):
+        raise TimeoutError(f"total did not change within {RENDER_TIMEOUT_MS} ms of adding the call; "
+                           "it would be the put leg's total")
+    timer.mark('call')
+
+    margin = parse_margin(await page.inner_text(TOTAL_SELECTOR))
+    timer.mark('total')
+    return margin
+
+
+async def run_margins(requests, url=CALCULATOR_URL, concurrency=4, rate=None, headless=True,
+                      api_pattern=MARGIN_API_PATTERN, cache=None, trade_date=None, params='', journal=None,
+                      channel=None, executable_path=None):
+    """Margins of ``requests`` as ``MarginResult`` rows in input order.
+
+    ``concurrency`` browser contexts are opened once and reused; a stock
+    that fails gets its error message and a ``None`` margin. ``steps`` maps
+    each step reached to its seconds.
+
+    With a ``cache``, margins stored for ``trade_date`` (default today) and
+    ``params`` (the risk-parameter file digest) are returned without
+    scraping, with empty ``steps``; new margins are stored. With a
+    ``journal``, rows it already holds are returned as journaled and every
+    scraped row is appended to it as soon as it finishes. ``channel`` (e.g.
+    ``'chrome'``) or ``executable_path`` launch an installed browser instead
+    of Playwright's bundled Chromium.
+    """
+    trade_date = trade_date or datetime.date.today()
+    results = [None] * len(requests)
+
+    if journal is not None:
+        done = journal.completed()
+        for i, request in enumerate(requests):
+            entry = done.get(journal_key(request.stock, request.expiry, request.strike))
+            if entry is not None:
+                results[i] = MarginResult(request.stock, request.strike, entry['margin'], None, entry['seconds'],
+                                          entry['steps'])
+
+    if cache is not None:
+        cache.purge(trade_date)
+        pending = [i for i, result in enumerate(results) if result is None]
+        margins = cache.lookup([(requests[i].stock, requests[i].expiry, requests[i].strike) for i in pending],
+                               trade_date, STRATEGY, 'calculator', params)
+        for i, margin in zip(pending, margins):
+            if margin is not None:
+                results[i] = MarginResult(requests[i].stock, requests[i].strike, margin, None, 0.0, {})
+
+    on_result = None
+    if journal is not None:
+        def on_result(request, result):
+            journal.append(request.stock, request.expiry, request.strike, result.margin, result.error,
+                           result.seconds, result.steps)
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        scraped = await scrape_margins([requests[i] for i in pending], url, concurrency, rate, headless, api_pattern,
+                                       on_result, channel, executable_path)
+        for i, result in zip(pending, scraped):
+            results[i] = result
+        if cache is not None:
+            cache.store([(requests[i].stock, requests[i].expiry, requests[i].strike, result.margin)
+                         for i, result in zip(pending, scraped)], trade_date, STRATEGY, 'calculator', params)
+    return results
+
+
+async def scrape_margins(requests, url=CALCULATOR_URL, concurrency=4, rate=None, headless=True,
+                         api_pattern=MARGIN_API_PATTERN, on_result=None, channel=None, executable_path=None):
+    """``run_margins`` without a cache: every request goes to the calculator.
+
+    ``on_result(request, result)`` is called as each stock finishes, in
+    completion order.
+    """
+    # Imported here so the rest of trading_tools never needs Playwright
+    from playwright.async_api import async_playwright
+
+    limiter = HostRateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=headless, channel=channel,
+                                                   executable_path=executable_path)
+        contexts = asyncio.Queue()
+        for _ in range(min(concurrency, len(requests)) or 1):
+            contexts.put_nowait(await browser.new_context(user_agent=USER_AGENT))
+
+        async def run_one(request):
+            async with semaphore:
+                context = await contexts.get()
+                timer = StepTimer()
+                start = time.perf_counter()
+                page = None
+                try:
+                    await limiter.wait(url)
+                    page = await context.new_page()
+                    timer.mark('rate_limit')
+                    margin = await calculate_margin(page, url, request, timer, api_pattern, limiter)
+                    result = MarginResult(request.stock, request.strike, margin, None, time.perf_counter() - start,
+                                          timer.steps)
+                except Exception as e:
+                    result = MarginResult(request.stock, request.strike, None, f"{type(e).__name__}: {e}",
+                                          time.perf_counter() - start, timer.steps)
+                finally:
+                    if page is not None:
+                        await page.close()
+                    contexts.put_nowait(context)
+                if on_result is not None:
+                    on_result(request, result)
+                return result
+
+        try:
+            return await asyncio.gather(*(run_one(request) for request in requests))
+        finally:
+            await browser.close()
+
+
+def step_summary(results):
+    """Milliseconds per step over the results: count, median, p95 and max."""
+    steps = pd.DataFrame([result.steps for result in results], columns=STEPS) * 1000
+    summary = steps.describe(percentiles=[0.5, 0.95]).T
+    return summary[['count', '50%', '95%', 'max']].rename(columns={'50%': 'p50_ms', '95%': 'p95_ms',
+                                                                   'max': 'max_ms'})
+
+
+def with_margins(sheet, results):
+    """Copy of the input sheet with the margin and error of every row."""
+    sheet = sheet.copy()
+    sheet[MARGIN_COLUMN] = [result.margin for result in results]
+    sheet[ERROR_COLUMN] = [result.error for result in results]
+    return sheet
+
+
+def save_sheet(sheet, path):
+    """Write ``sheet`` to ``path`` in one go, replacing the file atomically."""
+    path = Path(path)
+    # to_excel picks its writer from the extension
+    with atomic_path(path, suffix=path.suffix) as tmp:
+        if path.suffix.lower() in ('.xlsx', '.xls'):
+            sheet.to_excel(tmp, index=False)
+        else:
+            sheet.to_csv(tmp, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calculate SPAN margins for the stocks of an atm.xlsx sheet.")
+    parser.add_argument('sheet', type=Path, help="sheet with 'stocks' and 'atm' columns")
+    parser.add_argument('--expiry', required=True, help="contract expiry as listed by the calculator, e.g. 27-MAR-2025")
+    parser.add_argument('--concurrency', type=int, default=4, help="browser contexts working at once")
+    parser.add_argument('--rate', type=float, help="max calculator requests (page loads and Add submits) per second per host")
+    parser.add_argument('--url', default=CALCULATOR_URL)
+    parser.add_argument('--headed', action='store_true', help="show the browser windows")
+    parser.add_argument('--channel', help="installed browser to drive instead of Playwright's Chromium, e.g. chrome")
+    parser.add_argument('--executable-path', help="path of a Chromium-based browser binary to drive")
+    parser.add_argument('--out', type=Path)
+    parser.add_argument('--metrics', type=Path, help="CSV of per-stock step timings")
+    parser.add_argument('--risk-params', type=Path,
+                        help="current SPAN file; cached margins taken against another file are not reused")
+    parser.add_argument('--no-cache', action='store_true', help="scrape every stock, ignoring the margin cache")
+    parser.add_argument('--journal', type=Path,
+                        help="checkpoint file to resume an interrupted run from (default: next to --out)")
+    parser.add_argument('--restart', action='store_true', help="discard the journal of an earlier run")
+    args = parser.parse_args(argv)
+
+    sheet, requests = load_requests(args.sheet, args.expiry)
+    out = args.out or args.sheet.with_name(f"{args.sheet.stem}_with_margins.xlsx")
+    journal = MarginJournal(args.journal or out.with_name(f"{out.stem}.journal.jsonl"))
+    if args.restart:
+        journal.remove()
+    resumed = len(journal.completed())
+    if resumed:
+        print(f"resuming: {resumed} stocks already done in {journal.path}")
+    cache = None if args.no_cache else default_margin_cache()
+    params = file_digest(args.risk_params) if args.risk_params else ''
+    start = time.perf_counter()
+    results = asyncio.run(run_margins(requests, args.url, args.concurrency, args.rate, not args.headed,
+                                      cache=cache, params=params, journal=journal, channel=args.channel,
+                                      executable_path=args.executable_path))
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        print(f"{result.stock}: {result.error or result.margin} ({result.seconds:.1f} s)")
+    failed = sum(result.error is not None for result in results)
+    print(f"{len(results)} stocks in {elapsed:.1f} s, {failed} failed")
+    if cache is not None:
+        print(f"margin cache: {cache.hits} served, {cache.misses} scraped")
+    print(step_summary(results).round(1).to_string())
+    if args.metrics:
+        metrics = pd.DataFrame([result.steps for result in results], columns=STEPS)
+        metrics.insert(0, STOCK_COLUMN, [result.stock for result in results])
+        metrics.to_csv(args.metrics, index=False)
+
+    save_sheet(with_margins(sheet, results), out)
+    # Keep the journal while rows are missing so a rerun only retries those
+    if not failed:
+        journal.remove()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
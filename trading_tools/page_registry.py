@@ -0,0 +1,43 @@
+"""Registry of the dashboard pages under ``pages/``.
+
+Every entry point (``app.py``, ``nse_token_app.py``, ``poition_check.py``, ...)
+is a thin script that picks pages from this registry and hands them to
+``st.navigation``, so a page is written once and shows up the same way in
+each dashboard.
+"""
+import os
+from collections import namedtuple
+
+import streamlit as st
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pages')
+
+PageSpec = namedtuple('PageSpec', ['path', 'title', 'icon', 'url_path'])
+
+PAGES = {}
+
+
+def register_page(key, filename, title, icon=None):
+    # Page scripts live in pages/; url_path defaults to the registry key
+    PAGES[key] = PageSpec(os.path.join(PAGES_DIR, filename), title, icon, key)
+    return PAGES[key]
+
+
+register_page('token_generator', 'token_generator.py', "NSE Derivatives Analysis", ':material/token:')
+register_page('pos_dashboard', 'pos_dashboard.py', "POS File Dashboard", ':material/balance:')
+
+
+def navigation(keys, position='sidebar'):
+    """``st.navigation`` over the registered pages named in ``keys``.
+
+    A single page is shown without the navigation menu.
+    """
+    pages = []
+    for i, key in enumerate(keys):
+        spec = PAGES[key]
+        pages.append(st.Page(spec.path, title=spec.title, icon=spec.icon,
+                             url_path=spec.url_path, default=(i == 0)))
+    if len(pages) == 1:
+        position = 'hidden'
+    return st.navigation(pages, position=position)
+
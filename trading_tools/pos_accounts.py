@@ -0,0 +1,126 @@
+"""Consolidated POS view over several trading accounts.
+
+Each account's POS export is parsed, on a few threads when the upload is
+large, and tagged with an account id taken from its file name. The tagged books are stacked into one
+position model, so the consolidated totals, the per-account breakdown and
+the per-underlying match tables each come from a single grouped
+aggregation.
+
+    python -m trading_tools.pos_accounts ACC1_pos.xlsx ACC2_pos.xlsx --out pos_report
+"""
+import argparse
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trading_tools.pos import (EXPOSURE_COLUMN, M2M_COLUMN, POS_KEYWORDS, QTY_COLUMN, SYMBOL_COLUMN,
+                               TYPE_COLUMN, pos_summary, read_pos_file)
+from trading_tools.reconcile import mismatches, reconcile
+
+ACCOUNT_COLUMN = 'account'
+# Uploads smaller than this in total are parsed inline; a pool costs more than it saves
+INLINE_BYTES = 8 * 1024 * 1024
+MAX_WORKERS = 4
+
+
+def account_id(name):
+    # "ACC01_pos.xlsx" -> "ACC01_pos"
+    return Path(name).stem
+
+
+def parse_upload(name, data=None):
+    """Position model of one file, from its bytes or, without them, its path."""
+    return read_pos_file(io.BytesIO(data) if data is not None else name, name=name)
+
+
+def upload_size(name, data=None):
+    return len(data) if data is not None else os.path.getsize(name)
+
+
+def parse_files(files, workers=None):
+    """Parse ``(name, data)`` pairs, on a thread pool when the files are large.
+
+    ``data`` may be ``None`` to read ``name`` from disk. Several files over
+    ``INLINE_BYTES`` in total are parsed on up to ``workers`` threads
+    (default ``MAX_WORKERS``). Threads rather than processes, since this
+    runs inside the Streamlit server. Results come back in input order.
+    """
+    workers = min(workers or MAX_WORKERS, len(files))
+    if workers < 2 or sum(upload_size(name, data) for name, data in files) < INLINE_BYTES:
+        return [parse_upload(name, data) for name, data in files]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_upload, *zip(*files)))
+
+
+def combine_accounts(books):
+    """Stack ``(account, positions)`` pairs into one tagged position model."""
+    frames = [positions.assign(**{ACCOUNT_COLUMN: account}) for account, positions in books]
+    book = pd.concat(frames, ignore_index=True)
+    # Categories differ between files, so re-encode over the combined book
+    book[ACCOUNT_COLUMN] = book[ACCOUNT_COLUMN].astype('category')
+    book[SYMBOL_COLUMN] = book[SYMBOL_COLUMN].astype(str).astype('category')
+    return book[[ACCOUNT_COLUMN] + [column for column in book.columns if column != ACCOUNT_COLUMN]]
+
+
+def account_breakdown(book):
+    """Net FX/CE/PE quantity, FX exposure, M2M and match flag per account.
+
+    One groupby over (account, type) gives every per-account figure.
+    """
+    sums = book.groupby([ACCOUNT_COLUMN, TYPE_COLUMN], observed=False)[
+        [QTY_COLUMN, EXPOSURE_COLUMN, M2M_COLUMN]].sum().unstack(TYPE_COLUMN, fill_value=0)
+
+    qty = sums[QTY_COLUMN].reindex(columns=list(POS_KEYWORDS), fill_value=0)
+    result = pd.DataFrame({
+        'FX': qty['FX'].astype('int64'),
+        'CE': qty['CE'].astype('int64'),
+        'PE': qty['PE'].astype('int64'),
+        EXPOSURE_COLUMN: sums[EXPOSURE_COLUMN]['FX'],
+        M2M_COLUMN: sums[M2M_COLUMN].sum(axis=1),
+    })
+    fx = np.abs(result['FX'])
+    result['matched'] = (np.abs(result['CE']) == fx) & (np.abs(result['PE']) == fx)
+    result.index = result.index.astype(str)
+    return result
+
+
+def account_mismatches(book):
+    # Per-underlying mismatches inside each account, largest gap first
+    return mismatches(reconcile(book, by=[ACCOUNT_COLUMN]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consolidate POS files from several accounts.")
+    parser.add_argument('files', nargs='+', type=Path, help="POS exports (.xlsx, .xls, .csv), one per account")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help="threads parsing the files when they are large")
+    parser.add_argument('--out', type=Path, help="directory for the CSV reports")
+    args = parser.parse_args(argv)
+
+    books = parse_files([(str(path), None) for path in args.files], workers=args.workers)
+    book = combine_accounts([(account_id(path), positions) for path, positions in zip(args.files, books)])
+
+    _, exposure, fx_sum, ce_sum, pe_sum, position = pos_summary(book)
+    breakdown = account_breakdown(book)
+    consolidated = mismatches(reconcile(book))
+    per_account = account_mismatches(book)
+
+    print(f"{len(args.files)} accounts, {len(book)} legs")
+    print(f"Total Exposure: {exposure}  FX: {fx_sum}  CE: {ce_sum}  PE: {pe_sum}  Position: {position}")
+    print(breakdown.to_string())
+    print(f"{len(consolidated)} mismatched symbols across accounts, {len(per_account)} within accounts")
+
+    if args.out:
+        args.out.mkdir(parents=True, exist_ok=True)
+        breakdown.to_csv(args.out / 'accounts.csv')
+        consolidated.to_csv(args.out / 'mismatched_symbols.csv')
+        per_account.to_csv(args.out / 'mismatched_by_account.csv')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
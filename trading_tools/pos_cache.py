@@ -0,0 +1,71 @@
+"""Bounded LRU cache of parsed POS uploads, keyed on the uploaded bytes.
+
+Streamlit reruns the page script on every widget change. Keyed on a hash of
+the file's content, an upload is parsed and reconciled once; later reruns,
+and other sessions uploading the same file, get the stored snapshot.
+Entries are evicted least recently used once either the entry count or the
+estimated memory of the stored frames goes over its limit.
+"""
+import hashlib
+import os
+
+from trading_tools.lru import BoundedLRU
+from trading_tools.pos import EMPTY_POS_MESSAGE
+from trading_tools.pos_accounts import parse_files
+from trading_tools.pos_snapshot import PosSnapshot
+
+
+def upload_key(data, name):
+    # The extension is part of the key since it picks the reader
+    return hashlib.blake2b(data, digest_size=16).hexdigest(), os.path.splitext(name)[1].lower()
+
+
+def snapshot_nbytes(snapshot):
+    return int(snapshot.positions.memory_usage(deep=True).sum() + snapshot.reconciled.memory_usage(deep=True).sum())
+
+
+class PosFileCache:
+    def __init__(self, maxsize=16, max_bytes=256 * 1024 * 1024):
+        self._entries = BoundedLRU(maxsize, max_bytes, sizeof=snapshot_nbytes)
+
+    def snapshot(self, data, name):
+        """Cached ``PosSnapshot`` of an uploaded file's bytes.
+
+        Raises ``ValueError`` when the file has no CE/PE/FX rows; failed
+        parses are not cached.
+        """
+        return self.snapshots([(name, data)])[0]
+
+    def snapshots(self, uploads, workers=None):
+        """``snapshot`` for several ``(name, data)`` uploads, in input order.
+
+        Files missing from the cache are parsed together by ``parse_files``.
+        """
+        keys = [upload_key(data, name) for name, data in uploads]
+        found = {}
+        for key in keys:
+            if key not in found:
+                found[key] = self._entries.get(key)
+
+        missing = {key: upload for key, upload in zip(keys, uploads) if found[key] is None}
+        for key, positions in zip(missing, parse_files(list(missing.values()), workers=workers)):
+            if positions.empty:
+                raise ValueError(EMPTY_POS_MESSAGE)
+            found[key] = PosSnapshot(positions)
+            self._entries.put(key, found[key])
+        return [found[key] for key in keys]
+
+    def stats(self):
+        return self._entries.stats()
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _env_max_bytes():
+    max_mb = os.environ.get('POS_CACHE_MAX_MB')
+    return int(float(max_mb) * 1024 * 1024) if max_mb else 256 * 1024 * 1024
+
+
+# POS_CACHE_ITEMS and POS_CACHE_MAX_MB bound the shared cache
+pos_cache = PosFileCache(maxsize=int(os.environ.get('POS_CACHE_ITEMS', '16')), max_bytes=_env_max_bytes())
@@ -0,0 +1,121 @@
+"""POS snapshots and the position changes between re-uploads of a book.
+
+A ``PosSnapshot`` keeps a parsed upload together with its per-type totals
+and per-symbol reconciliation, computed once per upload (and shared through
+``PosFileCache``). ``update`` moves to the next upload's snapshot and diffs
+the two position models row by row, keyed on account, symbol, type and
+strike, for the table of what changed.
+"""
+import numpy as np
+import pandas as pd
+
+from trading_tools.pos import (EXPOSURE_COLUMN, M2M_COLUMN, QTY_COLUMN, STRIKE_COLUMN, SYMBOL_COLUMN,
+                               TYPE_COLUMN, TYPE_DTYPE, totals_summary, type_totals)
+from trading_tools.pos_accounts import ACCOUNT_COLUMN
+from trading_tools.reconcile import mismatches, reconcile
+
+KEY_COLUMNS = [SYMBOL_COLUMN, TYPE_COLUMN, STRIKE_COLUMN, 'leg']
+VALUE_COLUMNS = [QTY_COLUMN, EXPOSURE_COLUMN, M2M_COLUMN]
+CHANGE_COLUMNS = [SYMBOL_COLUMN, TYPE_COLUMN, STRIKE_COLUMN, 'status', 'qty_old', 'qty_new', 'qty_change',
+                  'm2m_change']
+
+
+def _codes(positions, column, categories):
+    # Codes of a categorical column against ``categories``; -1 when the book lacks the column
+    if column not in positions:
+        return np.full(len(positions), -1)
+    values = positions[column].cat
+    return categories.get_indexer(values.categories)[values.codes.to_numpy()]
+
+
+def _keyed(positions, symbols, accounts=None):
+    # Integer keys: symbol (and account) codes against the union of both
+    # uploads, type codes, the strike, and 'leg' numbering repeated rows of
+    # the same key in file order
+    keyed = pd.DataFrame({
+        SYMBOL_COLUMN: _codes(positions, SYMBOL_COLUMN, symbols),
+        TYPE_COLUMN: positions[TYPE_COLUMN].cat.codes.to_numpy(),
+        STRIKE_COLUMN: positions[STRIKE_COLUMN].to_numpy(),
+    })
+    if accounts is not None:
+        keyed.insert(0, ACCOUNT_COLUMN, _codes(positions, ACCOUNT_COLUMN, accounts))
+    keyed['leg'] = keyed.groupby(list(keyed.columns), dropna=False).cumcount()
+    for column in VALUE_COLUMNS:
+        keyed[column] = positions[column].to_numpy()
+    return keyed
+
+
+def _categories(old, new, column):
+    # Union of both books' categories of ``column``; None when neither has it
+    present = [book[column].cat.categories for book in (old, new) if column in book]
+    if not present:
+        return None
+    return present[0].union(present[-1])
+
+
+def diff_positions(old, new):
+    """Row-level diff of two position models.
+
+    Returns one row per key of either side with ``<value>_old`` and
+    ``<value>_new`` columns (0 where the row is missing) and a ``status`` of
+    ``'added'``, ``'removed'``, ``'changed'`` (quantity differs) or
+    ``'unchanged'``. Combined books are keyed per account as well.
+    """
+    symbols = _categories(old, new, SYMBOL_COLUMN)
+    accounts = _categories(old, new, ACCOUNT_COLUMN)
+    keys = KEY_COLUMNS if accounts is None else [ACCOUNT_COLUMN] + KEY_COLUMNS
+    diff = _keyed(old, symbols, accounts).merge(_keyed(new, symbols, accounts), on=keys, how='outer',
+                                                suffixes=('_old', '_new'), indicator=True)
+    if accounts is not None:
+        diff[ACCOUNT_COLUMN] = pd.Categorical.from_codes(diff[ACCOUNT_COLUMN], accounts)
+    diff[SYMBOL_COLUMN] = pd.Categorical.from_codes(diff[SYMBOL_COLUMN], symbols)
+    diff[TYPE_COLUMN] = pd.Categorical.from_codes(diff[TYPE_COLUMN], TYPE_DTYPE.categories)
+    for column in VALUE_COLUMNS:
+        for side in ('_old', '_new'):
+            diff[column + side] = diff[column + side].fillna(0)
+    diff['qty_old'] = diff['qty_old'].astype('int64')
+    diff['qty_new'] = diff['qty_new'].astype('int64')
+
+    diff['status'] = np.select(
+        [diff['_merge'] == 'left_only', diff['_merge'] == 'right_only', diff['qty_old'] != diff['qty_new']],
+        ['removed', 'added', 'changed'],
+        'unchanged',
+    )
+    return diff.drop(columns='_merge')
+
+
+def position_changes(old, new):
+    """Rows of ``diff_positions`` whose quantity was added, removed or changed,
+    with their quantity and M2M deltas."""
+    diff = diff_positions(old, new)
+    changes = diff[diff['status'] != 'unchanged'].copy()
+    changes['qty_change'] = changes['qty_new'] - changes['qty_old']
+    changes['m2m_change'] = changes['m2m_new'] - changes['m2m_old']
+    columns = ([ACCOUNT_COLUMN] if ACCOUNT_COLUMN in changes else []) + CHANGE_COLUMNS
+    order = [column for column in (ACCOUNT_COLUMN, SYMBOL_COLUMN, TYPE_COLUMN) if column in changes]
+    return changes[columns].sort_values(order).reset_index(drop=True)
+
+
+class PosSnapshot:
+    def __init__(self, positions, totals=None, reconciled=None):
+        self.positions = positions
+        self.totals = type_totals(positions) if totals is None else totals
+        self.reconciled = reconcile(positions) if reconciled is None else reconciled
+
+    def summary(self):
+        """``(exposure, fx_sum, ce_sum, pe_sum, position)`` as in ``pos_summary``."""
+        return totals_summary(self.totals)
+
+    def mismatched(self):
+        return mismatches(self.reconciled)
+
+    def update(self, new):
+        """Return ``(snapshot, changes)`` for the next upload of the book.
+
+        ``new`` is the next upload's ``PosSnapshot`` (or position model); its
+        own totals and reconciliation are kept, and ``changes`` is
+        ``position_changes`` against this snapshot.
+        """
+        if not isinstance(new, PosSnapshot):
+            new = PosSnapshot(new)
+        return new, position_changes(self.positions, new.positions)
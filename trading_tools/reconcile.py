@@ -0,0 +1,54 @@
+"""Per-underlying FX/CE/PE reconciliation of a POS position model.
+
+A symbol is matched when its net FX, CE and PE quantities are equal in
+absolute size, the same rule the dashboards apply to the global sums. All
+symbols are reconciled with one groupby over the categorical symbol and type
+columns, so the cost grows linearly with the number of legs.
+"""
+import numpy as np
+import pandas as pd
+
+from trading_tools.pos import POS_KEYWORDS, QTY_COLUMN, SYMBOL_COLUMN, TYPE_COLUMN
+
+RECONCILE_COLUMNS = ['FX', 'CE', 'PE', 'ce_gap', 'pe_gap', 'matched']
+
+
+def reconcile(positions, by=()):
+    """Net FX/CE/PE quantity per symbol, indexed by symbol.
+
+    ``ce_gap`` and ``pe_gap`` are how far ``abs(CE)`` and ``abs(PE)`` are
+    from ``abs(FX)``; ``matched`` is True when both gaps are zero. Columns
+    named in ``by`` (e.g. the account) are added in front of the symbol in
+    the index, so each of their groups is reconciled on its own.
+    """
+    keys = [*by, SYMBOL_COLUMN]
+    net = (
+        positions.groupby(keys + [TYPE_COLUMN], observed=True)[QTY_COLUMN].sum()
+        .unstack(TYPE_COLUMN, fill_value=0)
+    )
+    net.columns = list(net.columns)
+    net = net.reindex(columns=list(POS_KEYWORDS), fill_value=0).astype('int64')
+
+    fx = np.abs(net['FX'].to_numpy())
+    result = net[['FX', 'CE', 'PE']].copy()
+    result['ce_gap'] = np.abs(net['CE'].to_numpy()) - fx
+    result['pe_gap'] = np.abs(net['PE'].to_numpy()) - fx
+    result['matched'] = (result['ce_gap'] == 0) & (result['pe_gap'] == 0)
+    if by:
+        result.index = pd.MultiIndex.from_arrays(
+            [result.index.get_level_values(key).astype(str) for key in keys], names=keys)
+    else:
+        result.index = result.index.astype(str)
+    return result[RECONCILE_COLUMNS]
+
+
+def mismatched_symbols(positions):
+    """Rows of ``reconcile`` that do not match, largest gap first."""
+    return mismatches(reconcile(positions))
+
+
+def mismatches(reconciled):
+    # Unmatched rows of an existing reconcile() table, largest gap first
+    result = reconciled[~reconciled['matched']].drop(columns='matched')
+    size = np.maximum(result['ce_gap'].abs(), result['pe_gap'].abs())
+    return result.iloc[np.argsort(-size.to_numpy(), kind='stable')]
@@ -0,0 +1,35 @@
+"""Bounded LRU cache of token results.
+
+Entries are keyed on the bhav copy's content hash plus the full parameter
+tuple, so a rerun with the same inputs returns the stored frame instead of
+repeating the filter pipeline, and a changed bhav copy never serves a stale
+result. Display-only choices such as sort direction are applied by the
+caller on the cached frame.
+"""
+from trading_tools.bhav_store import frame_digest
+from trading_tools.lru import BoundedLRU
+from trading_tools.token_engine import generate_tokens
+
+
+class TokenResultCache:
+    def __init__(self, maxsize=32):
+        self._entries = BoundedLRU(maxsize)
+
+    def tokens(self, data, expiry, oi_threshold, atm_percentage, exclude=()):
+        """Cached ``generate_tokens``; returned frames must not be mutated."""
+        key = (frame_digest(data), str(expiry).upper(), float(oi_threshold), float(atm_percentage),
+               tuple(sorted(exclude)))
+        result = self._entries.get(key)
+        if result is None:
+            result = generate_tokens(data, expiry, oi_threshold, atm_percentage, exclude)
+            self._entries.put(key, result)
+        return result
+
+    def stats(self):
+        return self._entries.stats()
+
+    def clear(self):
+        self._entries.clear()
+
+
+token_cache = TokenResultCache()
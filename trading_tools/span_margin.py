@@ -0,0 +1,351 @@
+"""Offline SPAN plus exposure margins from the exchange's daily files.
+
+The SPAN risk-parameter file (NSE ``nsccl.YYYYMMDD.*.spn`` XML, optionally
+zipped) is read once into arrays: one row per futures and options contract
+with its price and 16-scenario risk array, plus each underlying's price and
+short option minimum. The exposure margin file (NSE ``ael_DDMMYYYY.csv``)
+gives each underlying's exposure margin percentage.
+
+Margins for any set of legs are then a single indexed lookup and a grouped
+sum over every portfolio at once:
+
+- scan risk: the worst of the 16 scenario losses of the portfolio
+- SPAN: ``max(scan risk, short option minimum) - net option value``, at
+  least zero, where the net option value is long minus short premium
+- exposure: the percentage of the future's value for futures and of the
+  underlying's value for short options
+
+Calendar spread charges are not applied, so results are for single-expiry
+portfolios such as the short future / short ATM put / long ATM call legs of
+``margin_runner``.
+
+    python -m trading_tools.span_margin atm_with_margins.xlsx --span nsccl.20250313.s.zip \\
+        --exposure ael_13032025.csv --expiry 2025-03-27 --trade-date 2025-03-13
+"""
+import argparse
+import datetime
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCENARIOS = 16
+OPTION_KINDS = {'C': 'CE', 'P': 'PE'}
+
+# One leg of the per-row strategy: instrument kind and signed lots; options use the row's strike
+Leg = namedtuple('Leg', ['kind', 'lots'])
+# The legs margin.py enters: short future, short ATM put, long ATM call
+STRATEGY = (Leg('FUT', -1), Leg('PE', -1), Leg('CE', 1))
+
+LEG_COLUMNS = ['portfolio', 'symbol', 'expiry', 'kind', 'strike', 'qty']
+MARGIN_COLUMNS = ['scan_risk', 'som', 'nov', 'span', 'exposure', 'total', 'error']
+
+
+def _open_span(path):
+    # The exchange ships the XML inside a zip
+    if zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        member = next(name for name in archive.namelist() if name.lower().endswith(('.spn', '.xml')))
+        return io.BytesIO(archive.read(member))
+    return open(path, 'rb')
+
+
+def _risk_array(element):
+    # <ra><r>1</r><a>-12.5</a><a>3.1</a>...<d>0.5</d></ra>: the 16 scenario
+    # losses are the <a> children in scenario order, <r> is the array id.
+    # A contract without one gets NaNs, so its legs are reported as missing
+    ra = element.find('ra')
+    if ra is None:
+        return np.full(SCENARIOS, np.nan)
+    values = [float(a.text) for a in ra.findall('a')]
+    if len(values) != SCENARIOS:
+        raise ValueError(f"Risk array with {len(values)} scenarios, expected {SCENARIOS}")
+    return np.array(values)
+
+
+def read_span_file(path):
+    """Contracts, their risk arrays and per-underlying values of a SPAN file.
+
+    Returns ``(contracts, risk, underlyings)``: ``contracts`` has symbol,
+    expiry, kind, strike (NaN for futures) and price; ``risk`` is the
+    ``(len(contracts), 16)`` loss per unit of a long position in each
+    scenario (NaN for a contract the file gives no risk array); ``underlyings`` is indexed by symbol with its ``price`` and
+    ``som`` (short option minimum per unit).
+    """
+    rows, arrays, prices, som = [], [], {}, {}
+
+    with _open_span(path) as handle:
+        # Each product portfolio is handled whole once parsed, then freed
+        for _, element in ET.iterparse(handle):
+            tag = element.tag
+            if tag == 'phyPf':
+                prices[element.findtext('pfCode').strip()] = float(element.findtext('phy/p'))
+            elif tag == 'futPf':
+                code = element.findtext('pfCode').strip()
+                for fut in element.iter('fut'):
+                    rows.append((code, fut.findtext('pe').strip(), 'FUT', np.nan, float(fut.findtext('p'))))
+                    arrays.append(_risk_array(fut))
+            elif tag == 'oopPf':
+                code = element.findtext('pfCode').strip()
+                for series in element.iter('series'):
+                    expiry = series.findtext('pe').strip()
+                    for opt in series.iter('opt'):
+                        rows.append((code, expiry, OPTION_KINDS[opt.findtext('o').strip()],
+                                     float(opt.findtext('k')), float(opt.findtext('p'))))
+                        arrays.append(_risk_array(opt))
+            elif tag == 'ccDef':
+                rate = element.find('.//somTiers//rate/val')
+                for pf_code in element.iter('pfCode'):
+                    som[pf_code.text.strip()] = float(rate.text) if rate is not None else 0.0
+            else:
+                continue
+            element.clear()
+
+    contracts = pd.DataFrame(rows, columns=['symbol', 'expiry', 'kind', 'strike', 'price'])
+    contracts['expiry'] = pd.to_datetime(contracts['expiry'], format='%Y%m%d')
+    risk = np.array(arrays, dtype=np.float64).reshape(len(rows), SCENARIOS)
+
+    underlyings = pd.DataFrame(index=pd.Index(sorted(set(contracts['symbol'])), name='symbol'))
+    # Underlyings without a physical price fall back to their nearest future
+    nearest = contracts[contracts['kind'] == 'FUT'].sort_values('expiry').groupby('symbol')['price'].first()
+    underlyings['price'] = pd.Series(prices).reindex(underlyings.index).fillna(nearest)
+    underlyings['som'] = pd.Series(som, dtype=float).reindex(underlyings.index).fillna(0.0)
+    return contracts, risk, underlyings
+
+
+def read_exposure_file(path):
+    """Exposure margin percentage by symbol from an NSE ael_*.csv file.
+
+    The symbol column is the one named "Symbol"; the percentage is the last
+    column whose name mentions ELM (the total applicable ELM).
+    """
+    table = pd.read_csv(path)
+    table.columns = [str(column).strip() for column in table.columns]
+    symbol = next(column for column in table.columns if column.lower() == 'symbol')
+    percent = [column for column in table.columns if 'elm' in column.lower()][-1]
+    exposure = pd.to_numeric(table[percent], errors='coerce')
+    exposure.index = table[symbol].astype(str).str.strip()
+    return exposure[~exposure.index.duplicated()]
+
+
+class SpanParameters:
+    """Indexed SPAN and exposure parameters of one trade date."""
+
+    def __init__(self, contracts, risk, underlyings, exposure=None):
+        self.contracts = contracts
+        self.risk = risk
+        self.underlyings = underlyings
+        self.exposure = (exposure if exposure is not None else pd.Series(dtype=float)).reindex(
+            underlyings.index).fillna(0.0)
+        self.has_risk = ~np.isnan(risk).any(axis=1)
+        # Futures have no strike; -1 keeps them in the same numeric key
+        self._keys = pd.MultiIndex.from_arrays([
+            contracts['symbol'], contracts['expiry'], contracts['kind'], contracts['strike'].fillna(-1),
+        ])
+
+    @classmethod
+    def from_files(cls, span_path, exposure_path=None):
+        contracts, risk, underlyings = read_span_file(span_path)
+        exposure = read_exposure_file(exposure_path) if exposure_path else None
+        return cls(contracts, risk, underlyings, exposure)
+
+    def lookup(self, legs):
+        """Contract row of every leg, -1 where the SPAN file has no such contract
+        or no risk array for it."""
+        keys = pd.MultiIndex.from_arrays([
+            legs['symbol'], pd.to_datetime(legs['expiry']).dt.normalize(), legs['kind'],
+            legs['strike'].fillna(-1),
+        ])
+        rows = self._keys.get_indexer(keys)
+        found = rows >= 0
+        rows[found] = np.where(self.has_risk[rows[found]], rows[found], -1)
+        return rows
+
+
+def strategy_legs(sheet, expiry, lot_sizes, strategy=STRATEGY, stock_column='stocks', strike_column='atm'):
+    """Legs of ``strategy`` for every row of an atm.xlsx-style sheet.
+
+    ``lot_sizes`` maps symbol to lot size; quantities are in units, negative
+    for short legs. The row position is the portfolio id.
+    """
+    symbols = sheet[stock_column].astype(str).str.strip().to_numpy()
+    strikes = pd.to_numeric(sheet[strike_column], errors='coerce').to_numpy(dtype=float)
+    lots = pd.Series(lot_sizes).reindex(symbols).to_numpy(dtype=float)
+    portfolio = np.arange(len(sheet))
+
+    frames = []
+    for leg in strategy:
+        frames.append(pd.DataFrame({
+            'portfolio': portfolio,
+            'symbol': symbols,
+            'expiry': pd.Timestamp(expiry),
+            'kind': leg.kind,
+            'strike': np.nan if leg.kind == 'FUT' else strikes,
+            'qty': leg.lots * lots,
+        }))
+    return pd.concat(frames, ignore_index=True)[LEG_COLUMNS]
+
+
+def compute_margins(params, legs, n_portfolios=None):
+    """SPAN, exposure and total margin per portfolio of a legs frame.
+
+    ``legs`` has the ``LEG_COLUMNS``. A portfolio with a contract missing
+    from the SPAN file (or given there without a risk array), or without a
+    lot size, gets NaN margins and an ``error``.
+    """
+    n_portfolios = n_portfolios if n_portfolios is not None else int(legs['portfolio'].max()) + 1
+    portfolio = legs['portfolio'].to_numpy()
+    qty = legs['qty'].to_numpy(dtype=float)
+    rows = params.lookup(legs)
+    known = (rows >= 0) & ~np.isnan(qty)
+
+    # Scenario losses summed per portfolio in one grouped pass
+    losses = pd.DataFrame(params.risk[rows[known]] * qty[known, None]).groupby(portfolio[known]).sum()
+    losses = losses.reindex(range(n_portfolios), fill_value=0.0).to_numpy()
+    scan_risk = np.maximum(losses.max(axis=1), 0.0)
+
+    kind = legs['kind'].to_numpy()
+    option = known & (kind != 'FUT')
+    short_option = option & (qty < 0)
+    symbol_rows = params.underlyings.index.get_indexer(legs['symbol'])
+    price = np.where(known, params.contracts['price'].to_numpy()[np.where(known, rows, 0)], 0.0)
+    som_rate = params.underlyings['som'].to_numpy()[symbol_rows]
+    underlying_price = params.underlyings['price'].to_numpy()[symbol_rows]
+    exposure_rate = params.exposure.to_numpy()[symbol_rows] / 100
+
+    per_leg = pd.DataFrame({
+        'som': np.where(short_option, -qty * som_rate, 0.0),
+        'nov': np.where(option, qty * price, 0.0),
+        'exposure': np.where(known & (kind == 'FUT'), np.abs(qty) * price * exposure_rate, 0.0)
+                    + np.where(short_option, -qty * underlying_price * exposure_rate, 0.0),
+    })
+    sums = per_leg.groupby(portfolio).sum().reindex(range(n_portfolios), fill_value=0.0)
+
+    result = pd.DataFrame({'scan_risk': scan_risk}, index=pd.RangeIndex(n_portfolios, name='portfolio'))
+    result['som'] = sums['som'].to_numpy()
+    result['nov'] = sums['nov'].to_numpy()
+    result['span'] = np.maximum(np.maximum(result['scan_risk'], result['som']) - result['nov'], 0.0)
+    result['exposure'] = sums['exposure'].to_numpy()
+    result['total'] = result['span'] + result['exposure']
+
+    # Missing contracts or lot sizes make the whole portfolio unknown
+    missing = legs.loc[~known]
+    result['error'] = None
+    if len(missing):
+        strikes = missing['strike'].map(lambda strike: '' if np.isnan(strike) else f" {strike:g}")
+        labels = missing['symbol'].astype(str) + ' ' + missing['kind'].astype(str) + strikes
+        errors = "no SPAN contract or lot size for " + labels.groupby(missing['portfolio']).agg(', '.join)
+        result['error'] = errors.reindex(result.index)
+    result.loc[result['error'].notna(), ['scan_risk', 'som', 'nov', 'span', 'exposure', 'total']] = np.nan
+    return result[MARGIN_COLUMNS]
+
+
+def margin_sheet(sheet, params, expiry, lot_sizes, strategy=STRATEGY):
+    """Copy of the sheet with SPAN, Exposure and Total columns from the files."""
+    margins = compute_margins(params, strategy_legs(sheet, expiry, lot_sizes, strategy), len(sheet))
+    sheet = sheet.copy()
+    sheet['SPAN'] = margins['span'].to_numpy()
+    sheet['Exposure'] = margins['exposure'].to_numpy()
+    sheet['Total'] = margins['total'].to_numpy()
+    sheet['Engine Error'] = margins['error'].to_numpy()
+    return sheet
+
+
+def validate(sheet, computed_column='Total', scraped_column='Margin', tolerance=0.02):
+    """Compare engine totals against previously scraped margins.
+
+    Returns ``(report, summary)``: per-row absolute and relative differences
+    with a ``within`` flag at ``tolerance`` (a fraction of the scraped
+    margin), and counts plus error statistics over the rows both sides have.
+    """
+    scraped = pd.to_numeric(sheet[scraped_column].astype(str).str.replace(r'[^\d.]', '', regex=True),
+                            errors='coerce')
+    report = pd.DataFrame({'scraped': scraped, 'computed': sheet[computed_column]})
+    report['abs_diff'] = (report['computed'] - report['scraped']).abs()
+    report['rel_diff'] = report['abs_diff'] / report['scraped'].abs()
+    report['within'] = report['rel_diff'] <= tolerance
+
+    compared = report.dropna(subset=['scraped', 'computed'])
+    summary = {
+        'rows': len(report),
+        'compared': len(compared),
+        'within': int(compared['within'].sum()),
+        'median_rel_diff': float(compared['rel_diff'].median()) if len(compared) else np.nan,
+        'max_rel_diff': float(compared['rel_diff'].max()) if len(compared) else np.nan,
+    }
+    return report, summary
+
+
+def bhav_lot_sizes(trade_date, expiry, symbols=None, store=None):
+    """Lot size per symbol of the ``expiry`` contracts in the bhav copy of ``trade_date``.
+
+    Lot sizes are revised between expiries, so only that expiry's rows are
+    used. Raises ``ValueError`` naming the ``symbols`` with no contract
+    expiring on ``expiry``.
+    """
+    from trading_tools.bhav_store import default_store
+    data = (store or default_store()).load(trade_date)
+    if data.empty:
+        raise ValueError(f"No bhav copy for {trade_date}")
+    on_expiry = pd.to_datetime(data['XpryDt'].astype(str), errors='coerce').dt.normalize() == pd.Timestamp(expiry)
+    data = data[on_expiry.to_numpy()]
+    lots = data.groupby(data['TckrSymb'].astype(str), observed=True)['NewBrdLotQty'].max()
+    if symbols is not None:
+        missing = sorted(set(symbols) - set(lots.index))
+        if missing:
+            raise ValueError(f"No contract expiring {expiry} in the {trade_date} bhav copy for: "
+                             + ', '.join(missing))
+    return lots
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute SPAN + exposure margins offline and check them.")
+    parser.add_argument('sheet', type=Path, help="sheet with 'stocks' and 'atm' columns, optionally 'lot' and 'Margin'")
+    parser.add_argument('--span', required=True, type=Path, help="SPAN risk-parameter file (.spn or .zip)")
+    parser.add_argument('--exposure', type=Path, help="exposure margin file (ael_*.csv)")
+    parser.add_argument('--expiry', required=True, type=datetime.date.fromisoformat)
+    parser.add_argument('--trade-date', type=datetime.date.fromisoformat,
+                        help="bhav copy date for lot sizes when the sheet has no 'lot' column")
+    parser.add_argument('--tolerance', type=float, default=0.02, help="relative difference counted as a match")
+    parser.add_argument('--out', type=Path)
+    args = parser.parse_args(argv)
+
+    sheet = pd.read_excel(args.sheet) if args.sheet.suffix.lower() in ('.xlsx', '.xls') else pd.read_csv(args.sheet)
+    symbols = sheet['stocks'].astype(str).str.strip()
+    if 'lot' in sheet.columns:
+        lot_sizes = dict(zip(symbols, sheet['lot']))
+    elif args.trade_date:
+        try:
+            lot_sizes = bhav_lot_sizes(args.trade_date, args.expiry, symbols)
+        except ValueError as exc:
+            parser.error(str(exc))
+    else:
+        parser.error("the sheet has no 'lot' column; pass --trade-date to take lot sizes from the bhav copy")
+
+    params = SpanParameters.from_files(args.span, args.exposure)
+    result = margin_sheet(sheet, params, args.expiry, lot_sizes)
+    failed = int(result['Engine Error'].notna().sum())
+    print(f"{len(result)} rows, {failed} without a margin")
+
+    if 'Margin' in result.columns:
+        report, summary = validate(result, tolerance=args.tolerance)
+        print(f"{summary['within']} of {summary['compared']} scraped margins within {args.tolerance:.1%}; "
+              f"median difference {summary['median_rel_diff']:.2%}, max {summary['max_rel_diff']:.2%}")
+        result['Difference %'] = (report['rel_diff'] * 100).round(2)
+        outside = result[~report['within'] & report['rel_diff'].notna()]
+        if len(outside):
+            print(outside[['stocks', 'atm', 'Margin', 'Total', 'Difference %']].to_string(index=False))
+
+    if args.out and args.out.suffix.lower() == '.xlsx':
+        result.to_excel(args.out, index=False)
+    elif args.out:
+        result.to_csv(args.out, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+"""Evaluate a grid of OI thresholds and ATM percentages from one bhav copy load.
+
+For every ATM percentage the far-from-the-money rows are found once and their
+open interest sorted; the number of rows above each OI threshold is then a
+``searchsorted`` away. The whole grid costs one sort per ATM value instead
+of one ``run_analysis`` per grid point.
+"""
+import numpy as np
+import pandas as pd
+
+from trading_tools.instrument_index import instrument_index
+from trading_tools.token_engine import TOKEN_COLUMN, TOKEN_PREFIX, atm_band_mask, moneyness_mask
+
+SWEEP_COLUMNS = ['oi_threshold', 'atm_percentage', 'fut', 'ce', 'pe', 'total', 'added', 'removed']
+
+
+def _count_above(sorted_values, thresholds):
+    # Number of values strictly greater than each threshold
+    return len(sorted_values) - np.searchsorted(sorted_values, thresholds, side='right')
+
+
+class TokenSweep:
+    """Token counts and token-set diffs over an (OI threshold, ATM %) grid.
+
+    Counts match ``generate_tokens`` at every grid point: each selected strike
+    contributes one CE and one PE token, plus the expiry's futures.
+    """
+
+    def __init__(self, data, expiry, exclude=()):
+        index = instrument_index(data)
+        self.expiry = index.expiries.resolve(expiry)
+        rows = index.rows_for_expiry(self.expiry)
+        self.index = index
+
+        # Excluded symbols never reach the token list, so drop them up front
+        rows = rows[~index.excluded_rows(exclude)[rows]]
+        self.fut_rows = rows[index.is_fut[rows]]
+        candidates = moneyness_mask(index.strike[rows], index.underlying_price[rows], index.option_type[rows])
+        self.option_rows = rows[candidates]
+
+        self.strike = index.strike[self.option_rows]
+        self.underlying = index.underlying_price[self.option_rows]
+        self.oi_lots = index.oi_lots[self.option_rows]
+
+    def selected(self, oi_threshold, atm_percentage):
+        """Boolean mask over ``option_rows`` kept at one grid point."""
+        far = atm_band_mask(self.strike, self.underlying, atm_percentage)
+        return ~far | (self.oi_lots > oi_threshold)
+
+    def run(self, oi_thresholds, atm_percentages, baseline=None):
+        """Return one row per grid point with FUT/CE/PE counts.
+
+        ``added``/``removed`` count the tokens gained or lost relative to the
+        ``baseline`` ``(oi_threshold, atm_percentage)`` point, when given.
+        """
+        thresholds = np.asarray(oi_thresholds)
+        percentages = np.asarray(atm_percentages)
+        in_baseline = self.selected(*baseline) if baseline is not None else None
+
+        selected = np.empty((len(percentages), len(thresholds)), dtype=np.int64)
+        added = np.zeros_like(selected)
+        removed = np.zeros_like(selected)
+
+        for i, atm_percentage in enumerate(percentages):
+            far = atm_band_mask(self.strike, self.underlying, atm_percentage)
+            near = ~far
+            selected[i] = near.sum() + _count_above(np.sort(self.oi_lots[far]), thresholds)
+            if in_baseline is not None:
+                # Rows outside the baseline that this point keeps
+                outside = ~in_baseline
+                added[i] = (near & outside).sum() + _count_above(np.sort(self.oi_lots[far & outside]), thresholds)
+                kept = (near & in_baseline).sum() + _count_above(np.sort(self.oi_lots[far & in_baseline]), thresholds)
+                removed[i] = in_baseline.sum() - kept
+
+        fut = len(self.fut_rows)
+        grid = pd.DataFrame({
+            'oi_threshold': np.tile(thresholds, len(percentages)),
+            'atm_percentage': np.repeat(percentages, len(thresholds)),
+            'fut': fut,
+            'ce': selected.ravel(),
+            'pe': selected.ravel(),
+            'total': fut + 2 * selected.ravel(),
+            # Each option row carries a CE and a PE token
+            'added': 2 * added.ravel(),
+            'removed': 2 * removed.ravel(),
+        }, columns=SWEEP_COLUMNS)
+        return grid
+
+    def tokens(self, oi_threshold, atm_percentage):
+        """Token list at one grid point, in ``generate_tokens`` format."""
+        stems = self.index.stem[self.option_rows[self.selected(oi_threshold, atm_percentage)]]
+        tokens = np.concatenate([
+            TOKEN_PREFIX + stems + 'CE',
+            TOKEN_PREFIX + stems + 'PE',
+            TOKEN_PREFIX + self.index.name[self.fut_rows],
+        ])
+        return pd.DataFrame({TOKEN_COLUMN: tokens}).sort_values(by=TOKEN_COLUMN)
+
+    def diff(self, point, baseline):
+        """Tokens added and removed going from ``baseline`` to ``point``."""
+        now = self.selected(*point)
+        before = self.selected(*baseline)
+        diffs = []
+        for mask in (now & ~before, before & ~now):
+            stems = self.index.stem[self.option_rows[mask]]
+            diffs.append(sorted(np.concatenate([TOKEN_PREFIX + stems + 'CE', TOKEN_PREFIX + stems + 'PE'])))
+        return diffs[0], diffs[1]
+
+
+def sweep_tokens(data, expiry, oi_thresholds, atm_percentages, baseline=None, exclude=()):
+    """Run a grid sweep; returns ``(grid_df, error)`` like ``run_analysis``."""
+    if data.empty:
+        return None, "No data available for the selected date."
+    sweep = TokenSweep(data, expiry, exclude)
+    if not len(sweep.option_rows) and not len(sweep.fut_rows):
+        return None, f"No contracts found for {expiry}."
+    return sweep.run(oi_thresholds, atm_percentages, baseline), None
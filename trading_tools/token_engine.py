@@ -0,0 +1,120 @@
+"""Vectorized stock CR token generation from an F&O bhav copy.
+
+This is the single implementation behind ``run_analysis`` in the dashboards.
+Instruments come from the parsed ``InstrumentIndex`` of the bhav copy, and
+every filter is a boolean NumPy mask over its arrays, so the cost is a
+handful of array passes instead of one Python call per option row.
+
+The result frame carries each token's instrument type as a categorical and
+its per-type counts in ``attrs``, so the dashboards never scan the token
+text to summarise it.
+"""
+import numpy as np
+import pandas as pd
+
+from trading_tools.instrument_index import instrument_index
+
+TOKEN_PREFIX = 'NRML|'
+TOKEN_COLUMN = 'All Columns'
+TYPE_COLUMN = 'Type'
+TOKEN_TYPES = ['FUT', 'CE', 'PE']
+TOKEN_TYPE_DTYPE = pd.CategoricalDtype(TOKEN_TYPES)
+
+
+def parse_symbols(text):
+    """Set of upper-case symbols from comma or whitespace separated text."""
+    return frozenset(text.replace(',', ' ').upper().split())
+
+
+def token_counts(result_df):
+    """``{'FUT': n, 'CE': n, 'PE': n}`` of a ``generate_tokens`` frame."""
+    counts = result_df.attrs.get('counts')
+    if counts is None:
+        counts = result_df[TYPE_COLUMN].value_counts().to_dict()
+    return {token_type: int(counts.get(token_type, 0)) for token_type in TOKEN_TYPES}
+
+
+def moneyness_mask(strike, underlying, option_type):
+    # PE at or above the underlying, CE at or below it
+    return (
+        ((strike >= underlying) & (option_type == 'PE')) |
+        ((strike <= underlying) & (option_type == 'CE'))
+    )
+
+
+def atm_band_mask(strike, underlying, atm_percentage):
+    # True for strikes outside the +/- atm_percentage band around the underlying
+    atm_decimal = atm_percentage / 100
+    return (
+        (strike <= underlying - (atm_decimal * underlying)) |
+        (strike >= underlying + (atm_decimal * underlying))
+    )
+
+
+def generate_tokens(data, expiry, oi_threshold, atm_percentage, exclude=()):
+    """Build the token frame for one bhav copy.
+
+    ``expiry`` is ``'NEAR'``/``'NEXT'``/``'FAR'``, a month name or an expiry
+    date, resolved to one exact expiry of the bhav copy. ``exclude`` names
+    underlyings to leave out on top of the index products and dotted symbols
+    that are always dropped. Returns ``(result_df, error)`` with the same
+    contract as ``run_analysis``: a frame with the ``'All Columns'`` token
+    and its ``'Type'`` (FUT/CE/PE categorical), sorted alphabetically once,
+    or ``None`` and a message when a filter leaves nothing. The resolved date
+    is kept in ISO form in ``result_df.attrs['expiry']`` and the per-type
+    counts in ``result_df.attrs['counts']``.
+    """
+    if data.empty:
+        return None, "No data available for the selected date."
+
+    index = instrument_index(data)
+
+    # Instruments of the resolved expiry date, in (underlying, strike) order
+    resolved = index.expiries.resolve(expiry)
+    rows = index.rows_for_expiry(resolved)
+    if not len(rows):
+        return None, f"No contracts found for {expiry}."
+
+    strike = index.strike[rows]
+    underlying = index.underlying_price[rows]
+
+    candidates = moneyness_mask(strike, underlying, index.option_type[rows])
+    if not candidates.any():
+        return None, "No matching data after applying filters."
+
+    # Near strikes are always kept, far strikes only with enough open interest
+    far = atm_band_mask(strike, underlying, atm_percentage)
+    liquid = index.oi_lots[rows] > oi_threshold
+    selected = candidates & (~far | liquid)
+    if not selected.any():
+        return None, "No data after applying OI threshold filter."
+
+    # Every selected strike produces both its CE and PE token from the shared stem
+    option_rows = rows[selected]
+    fut_rows = rows[index.is_fut[rows]]
+    stems = index.stem[option_rows]
+
+    tokens = np.concatenate([
+        TOKEN_PREFIX + stems + 'CE',
+        TOKEN_PREFIX + stems + 'PE',
+        TOKEN_PREFIX + index.name[fut_rows],
+    ])
+    excluded_rows = index.excluded_rows(exclude)
+    option_kept = ~excluded_rows[option_rows]
+    fut_kept = ~excluded_rows[fut_rows]
+    kept = np.concatenate([option_kept, option_kept, fut_kept])
+
+    # Type codes follow the CE, PE, FUT blocks of the token array
+    n_options, n_fut = int(option_kept.sum()), int(fut_kept.sum())
+    types = np.repeat(np.array([1, 2, 0], dtype=np.int8), [n_options, n_options, n_fut])
+    tokens = tokens[kept]
+    order = np.argsort(tokens, kind='stable')
+
+    result = pd.DataFrame({
+        TOKEN_COLUMN: tokens[order],
+        TYPE_COLUMN: pd.Categorical.from_codes(types[order], dtype=TOKEN_TYPE_DTYPE),
+    }, index=np.flatnonzero(kept)[order])
+    # Kept as text and ints so the frame's attrs stay JSON serializable for st.dataframe
+    result.attrs['expiry'] = resolved.isoformat()
+    result.attrs['counts'] = {'FUT': n_fut, 'CE': n_options, 'PE': n_options}
+    return result, None
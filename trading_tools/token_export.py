@@ -0,0 +1,91 @@
+"""Chunked CSV/TXT export of token frames, with an optional gzip variant.
+
+The export is generated chunk by chunk from the token column, so files
+written to disk never exist as one string in memory. Bytes handed to the
+dashboard download buttons are built only when a download is requested and
+kept in a bounded LRU keyed on the token frame's content hash, the format
+and the sort direction.
+"""
+import zlib
+
+from trading_tools.atomic_write import atomic_path
+from trading_tools.bhav_store import frame_digest
+from trading_tools.lru import BoundedLRU
+from trading_tools.token_engine import TOKEN_COLUMN
+
+EXPORT_FORMATS = {'csv': 'text/csv', 'txt': 'text/plain'}
+CHUNK_ROWS = 50_000
+
+
+def export_name(date_str, expiry_text, fmt, compress=False):
+    return f"stock_crtoken_{date_str}_{expiry_text}.{fmt}" + ('.gz' if compress else '')
+
+
+def export_mime(fmt, compress=False):
+    return 'application/gzip' if compress else EXPORT_FORMATS[fmt]
+
+
+def _text_chunks(result_df, fmt, descending=False, chunk_rows=CHUNK_ROWS):
+    tokens = result_df[[TOKEN_COLUMN]]
+    if descending:
+        tokens = tokens.iloc[::-1]
+    for start in range(0, max(len(tokens), 1), chunk_rows):
+        chunk = tokens.iloc[start:start + chunk_rows]
+        if fmt == 'csv':
+            # Same bytes as one to_csv call: the header only on the first chunk
+            yield chunk.to_csv(index=False, header=start == 0).encode('utf-8')
+        else:
+            # Lines joined with newlines and no trailing one, as before
+            text = "\n".join(chunk[TOKEN_COLUMN].tolist())
+            yield (text if start == 0 else "\n" + text).encode('utf-8')
+
+
+def _gzip_chunks(chunks):
+    # gzip container with a zero mtime, so equal tokens give equal bytes
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(result_df, fmt, compress=False, descending=False, chunk_rows=CHUNK_ROWS):
+    """Yield the ``fmt`` export of a token frame as byte chunks."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    chunks = _text_chunks(result_df, fmt, descending, chunk_rows)
+    return _gzip_chunks(chunks) if compress else chunks
+
+
+def write_export(path, result_df, fmt, compress=False, descending=False):
+    """Stream an export to ``path`` atomically; returns the bytes written."""
+    written = 0
+    with atomic_path(path) as tmp, open(tmp, 'wb') as handle:
+        for chunk in export_chunks(result_df, fmt, compress, descending):
+            handle.write(chunk)
+            written += len(chunk)
+    return written
+
+
+class ExportCache:
+    def __init__(self, maxsize=16, max_bytes=64 * 1024 * 1024):
+        self._entries = BoundedLRU(maxsize, max_bytes)
+
+    def export_bytes(self, result_df, fmt, compress=False, descending=False):
+        """Cached ``export_chunks`` joined into bytes, for download buttons."""
+        key = (frame_digest(result_df), fmt, compress, descending)
+        data = self._entries.get(key)
+        if data is None:
+            data = b"".join(export_chunks(result_df, fmt, compress, descending))
+            self._entries.put(key, data)
+        return data
+
+    def stats(self):
+        return self._entries.stats()
+
+    def clear(self):
+        self._entries.clear()
+
+
+export_cache = ExportCache()
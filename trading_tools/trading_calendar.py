@@ -0,0 +1,140 @@
+"""NSE trading calendar built once per process and persisted to disk.
+
+The schedule for a multi-year window is taken from pandas_market_calendars
+once and kept as a sorted ``datetime64[D]`` array, so every lookup is a
+binary search. The array is saved next to the bhav store; a cold start just
+loads it and never imports pandas_market_calendars unless the file is
+missing, stale, or a date outside the window is asked for.
+"""
+import datetime
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from trading_tools.atomic_write import atomic_path
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'trading_tools' / 'nse_sessions.npz'
+
+# Years of sessions kept on each side of today
+YEARS_BACK = 6
+YEARS_AHEAD = 1
+
+
+def _day(value):
+    return np.datetime64(value, 'D')
+
+
+class TradingCalendar:
+    """Sorted NSE session dates with O(log n) lookups."""
+
+    def __init__(self, sessions, start, end):
+        self.sessions = np.asarray(sessions, dtype='datetime64[D]')
+        self.start = _day(start)
+        self.end = _day(end)
+
+    @classmethod
+    def build(cls, start, end):
+        import pandas_market_calendars as mcal
+        schedule = mcal.get_calendar('NSE').schedule(start_date=start, end_date=end)
+        return cls(schedule.index.values.astype('datetime64[D]'), start, end)
+
+    def covers(self, date):
+        return self.start <= _day(date) <= self.end
+
+    def is_trading_day(self, date):
+        date = _day(date)
+        i = np.searchsorted(self.sessions, date)
+        return bool(i < len(self.sessions) and self.sessions[i] == date)
+
+    def previous_trading_day(self, date):
+        """Last session strictly before ``date``, or ``None``."""
+        i = np.searchsorted(self.sessions, _day(date), side='left')
+        return self.sessions[i - 1].astype(datetime.date) if i > 0 else None
+
+    def next_trading_day(self, date):
+        """First session strictly after ``date``, or ``None``."""
+        i = np.searchsorted(self.sessions, _day(date), side='right')
+        return self.sessions[i].astype(datetime.date) if i < len(self.sessions) else None
+
+    def sessions_between(self, start, end):
+        """Sessions from ``start`` to ``end`` inclusive, as ``datetime.date``."""
+        lo = np.searchsorted(self.sessions, _day(start), side='left')
+        hi = np.searchsorted(self.sessions, _day(end), side='right')
+        return self.sessions[lo:hi].astype(datetime.date).tolist()
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # np.savez appends .npz to any other name
+        with atomic_path(path, suffix='.npz') as tmp:
+            np.savez(tmp, sessions=self.sessions, window=np.array([self.start, self.end]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as stored:
+            start, end = stored['window']
+            return cls(stored['sessions'], start, end)
+
+
+class CalendarService:
+    """Process-wide calendar that rebuilds only when a date falls outside its window.
+
+    The persisted file is refreshed after ``max_age_days`` so newly announced
+    holidays are picked up.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_age_days=7):
+        self.path = Path(path)
+        self.max_age_days = max_age_days
+        self._calendar = None
+        self._lock = threading.Lock()
+
+    def calendar(self, *dates):
+        """Calendar covering every one of ``dates``, rebuilt at most once."""
+        with self._lock:
+            if self._calendar is None:
+                self._calendar = self._load_persisted()
+            if self._calendar is None or not all(self._calendar.covers(date) for date in dates):
+                self._calendar = self._rebuild(dates)
+            return self._calendar
+
+    def _load_persisted(self):
+        if not self.path.exists():
+            return None
+        if time.time() - self.path.stat().st_mtime > self.max_age_days * 86400:
+            return None
+        try:
+            return TradingCalendar.load(self.path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _rebuild(self, dates):
+        # The default window, widened to the current window and every requested date
+        today = datetime.date.today()
+        start = datetime.date(today.year - YEARS_BACK, 1, 1)
+        end = datetime.date(today.year + YEARS_AHEAD, 12, 31)
+        bounds = [_day(date).astype(datetime.date) for date in dates]
+        if self._calendar is not None:
+            bounds += [self._calendar.start.astype(datetime.date), self._calendar.end.astype(datetime.date)]
+        start, end = min([start] + bounds), max([end] + bounds)
+        calendar = TradingCalendar.build(start, end)
+        calendar.save(self.path)
+        return calendar
+
+    def is_trading_day(self, date):
+        return self.calendar(date).is_trading_day(date)
+
+    def previous_trading_day(self, date):
+        return self.calendar(date).previous_trading_day(date)
+
+    def next_trading_day(self, date):
+        return self.calendar(date).next_trading_day(date)
+
+    def sessions_between(self, start, end):
+        return self.calendar(start, end).sessions_between(start, end)
+
+
+nse_calendar = CalendarService(os.environ.get('NSE_CALENDAR_PATH', DEFAULT_CACHE_PATH))